@@ -1,12 +1,21 @@
+import time
+
 import streamlit as st
-from PIL import Image
 from datetime import datetime, timedelta
-import pandas as pd
 
-from ui.description import app_description
-from ui.home import home_page
-from ui.ml import predict_new_customer
-from ui.eda import analyze_age_avg, analyze_age_counts, analyze_category_amounts, analyze_cluster_age_distribution, analyze_cluster_purchase, analyze_cluster_rating, analyze_cluster_sales, analyze_gender_counts, analyze_item_amounts, analyze_location_amounts, analyze_payment_counts, analyze_season_amounts, analyze_season_category, load_data
+from ui.background import poll_task
+from ui.instrumentation import measure, recent_events, reset, summary, to_jsonl
+from ui.startup import import_page_module, record_render, startup_report, uptime
+
+# 메뉴별 (모듈, 함수) - 무거운 모듈(sklearn, plotly 등)은 해당 페이지가 선택될 때만 import
+PAGES = {
+    "🏠 홈": ('ui.home', 'home_page'),
+    "📖 앱 소개": ('ui.description', 'app_description'),
+    "🎯 고객 유형 예측": ('ui.ml', 'predict_new_customer'),
+    "📊 데이터 분석": ('ui.eda', None),
+    "🔍 고객 검색": ('ui.search', 'customer_search_page'),
+    "📉 고객 유형 변화": ('ui.drift', 'segment_drift_page'),
+}
 
 def sidebar():
     # 사이드바 제목
@@ -15,14 +24,7 @@ def sidebar():
     st.sidebar.markdown("---")
 
     # 주요 메뉴 선택 (아이콘 포함)
-    pages = {
-        "🏠 홈": home_page,
-        "📖 앱 소개": app_description,
-        "🎯 고객 유형 예측": predict_new_customer,
-        "📊 데이터 분석": lambda: data_analysis_page()
-    }
-    
-    choice = st.sidebar.radio("메뉴 선택", list(pages.keys()))
+    choice = st.sidebar.radio("메뉴 선택", list(PAGES.keys()))
 
     st.sidebar.markdown("---")
 
@@ -43,26 +45,63 @@ def sidebar():
     with st.sidebar.expander("시스템 정보"):
         st.write("버전: v1.0.0")
         st.write("최종 업데이트: 2025-02-06")
+        st.checkbox("성능 계측 보기 (관리자)", key="show_timings")
+
+    # 페이지 렌더링이 끝난 뒤 시작 성능 정보와 계측 결과를 채운다
+    report_slot = st.sidebar.empty()
 
     st.sidebar.markdown("---")
 
     st.sidebar.info('고객센터 : 031-xxx-xxxx')
 
-    return choice
+    return choice, report_slot
+
+def show_startup_report(report_slot):
+    with report_slot.container():
+        with st.expander("시작 성능"):
+            st.write(f"프로세스 가동 시간: {uptime():,.1f}초")
+            st.dataframe(startup_report(), hide_index=True)
+        if st.session_state.get("show_timings"):
+            show_timings()
+
+def show_timings():
+    # 함수별 소요 시간과 캐시 적중 횟수 (프로세스 전체 누적)
+    with st.expander("성능 계측", expanded=True):
+        st.dataframe(summary(), hide_index=True)
+        st.caption("최근 호출")
+        st.dataframe(recent_events(20)[::-1], hide_index=True)
+        st.download_button("JSON lines 다운로드", to_jsonl().encode('utf-8'),
+                           file_name="timings.jsonl", mime='application/jsonl')
+        if st.button("계측 기록 초기화"):
+            reset()
+
+def load_page(choice):
+    module_name, func_name = PAGES[choice]
+    module = import_page_module(choice, module_name)
+    if func_name is None:
+        return data_analysis_page
+    return getattr(module, func_name)
 
 def data_analysis_page():
-    data = load_data()
-    if data is None:
-        st.error("데이터를 불러오는 데 실패했습니다.")
+    from ui.eda import analyze_age_avg, analyze_age_counts, analyze_category_amounts, analyze_cluster_age_distribution, analyze_cluster_purchase, analyze_cluster_rating, analyze_cluster_recommendations, analyze_cluster_sales, analyze_gender_counts, analyze_item_amounts, analyze_live_clusters, analyze_location_amounts, analyze_payment_counts, analyze_season_amounts, analyze_season_category, load_aggregates_async
+
+    # 원본 데이터 대신 데이터 버전별로 캐시된 집계 테이블만 사용
+    # 집계는 백그라운드에서 불러오고, 탭과 설명을 먼저 그린 뒤 차트 자리에 결과를 채운다
+    try:
+        aggs_task = load_aggregates_async()
+    except Exception as e:
+        st.error(f"데이터를 불러오는 데 실패했습니다: {e}")
         return
 
-    tab1, tab2, tab3 = st.tabs([
+    # st.tabs 는 보이지 않는 탭까지 모두 실행하므로, 선택된 탭의 차트만 만들고 전송한다
+    tab_labels = [
         f"📊 고객 분석",
         f"📈 매출 분석",
         f"👨‍👩‍👧‍👦 고객 유형별 분석"
-    ])
+    ]
+    tab = st.radio("분석 항목", tab_labels, horizontal=True, label_visibility="collapsed", key="analysis_tab")
     
-    with tab1:
+    if tab == tab_labels[0]:
         st.subheader("고객 분석")
         st.markdown(
             """
@@ -74,12 +113,15 @@ def data_analysis_page():
             """,
             unsafe_allow_html=True
         )
-        analyze_gender_counts(data)
-        analyze_payment_counts(data)
-        analyze_age_counts(data)
-        analyze_age_avg(data)
+        aggs = _await_aggregates(aggs_task)
+        if aggs is None:
+            return
+        analyze_gender_counts(aggs)
+        analyze_payment_counts(aggs)
+        analyze_age_counts(aggs)
+        analyze_age_avg(aggs)
     
-    with tab2:
+    elif tab == tab_labels[1]:
         st.subheader("매출 분석")
         st.markdown(
             """
@@ -91,13 +133,16 @@ def data_analysis_page():
             """,
             unsafe_allow_html=True
         )
-        analyze_category_amounts(data)
-        analyze_location_amounts(data)
-        analyze_season_amounts(data)
-        analyze_item_amounts(data)
-        analyze_season_category(data)
+        aggs = _await_aggregates(aggs_task)
+        if aggs is None:
+            return
+        analyze_category_amounts(aggs)
+        analyze_location_amounts(aggs)
+        analyze_season_amounts(aggs)
+        analyze_item_amounts(aggs)
+        analyze_season_category(aggs)
     
-    with tab3:
+    elif tab == tab_labels[2]:
         st.subheader("고객 유형별 분석")
         st.markdown(
             """
@@ -109,22 +154,34 @@ def data_analysis_page():
             """,
             unsafe_allow_html=True
         )
-        analyze_cluster_purchase(data)
-        analyze_cluster_rating(data)
-        analyze_cluster_sales(data)
-        analyze_cluster_age_distribution(data)
+        aggs = _await_aggregates(aggs_task)
+        if aggs is None:
+            return
+        analyze_cluster_purchase(aggs)
+        analyze_cluster_rating(aggs)
+        analyze_cluster_sales(aggs)
+        analyze_cluster_age_distribution(aggs)
+        analyze_cluster_recommendations(aggs)
+        analyze_live_clusters()
+
+def _await_aggregates(task):
+    try:
+        ready, aggs = poll_task(task, "데이터를 불러오는 중입니다...")
+    except Exception as e:
+        st.error(f"데이터를 불러오는 데 실패했습니다: {e}")
+        return None
+    return aggs if ready else None
 
 def main():
-    choice = sidebar()
-
-    if choice == "🏠 홈":
-        home_page()
-    elif choice == "📖 앱 소개":
-        app_description()
-    elif choice == "🎯 고객 유형 예측":
-        predict_new_customer()
-    elif choice == "📊 데이터 분석":
-        data_analysis_page()
+    choice, report_slot = sidebar()
+
+    page = load_page(choice)
+    start = time.perf_counter()
+    with measure(f'page:{choice}'):
+        page()
+    record_render(choice, time.perf_counter() - start)
+
+    show_startup_report(report_slot)
 
 if __name__ == '__main__':
     main()
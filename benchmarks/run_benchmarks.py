@@ -0,0 +1,160 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from ui.aggregates import DIMENSIONS, PAIRS, compute_aggregates, group_stats
+from ui.data_store import build_cache, load_customer_data
+from ui.fast_scorer import FastScorer, verify
+from ui.features import add_derived_features
+from ui.scoring import FEATURE_COLUMNS, load_model, predict_in_chunks
+
+TEMPLATE_PATH = 'data/shopping_trends.csv'
+RESULTS_DIR = 'benchmarks/results'
+DEFAULT_SIZES = [10_000, 1_000_000, 10_000_000]
+
+def synthesize(rows, template_path=TEMPLATE_PATH, seed=42):
+    # shopping_trends.csv 와 같은 컬럼/값 분포를 가진 데이터를 rows 행 만큼 생성
+    template = pd.read_csv(template_path)
+    rng = np.random.default_rng(seed)
+    data = {}
+    for col in template.columns:
+        if col == 'Customer ID':
+            data[col] = np.arange(1, rows + 1)
+        elif col == 'Review Rating':
+            data[col] = np.round(rng.uniform(template[col].min(), template[col].max(), rows), 1)
+        elif pd.api.types.is_integer_dtype(template[col]):
+            data[col] = rng.integers(template[col].min(), template[col].max() + 1, rows)
+        else:
+            values = template[col].value_counts(normalize=True)
+            data[col] = rng.choice(values.index.to_numpy(), size=rows, p=values.to_numpy())
+    data['Cluster'] = rng.integers(0, 6, rows)
+    return pd.DataFrame(data)
+
+def timed(func, repeat):
+    # repeat 번 실행해 가장 빠른 시간을 사용
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+def run_size(rows, model, workdir, repeat, single_rows, predict_rows):
+    results = []
+
+    def record(name, seconds, count):
+        results.append({'name': name, 'rows': rows, 'items': count, 'seconds': round(seconds, 6),
+                        'items_per_s': round(count / seconds, 1) if seconds else None})
+        print(f"  {name:<36} {seconds:>10.4f}s  ({count:,} items)")
+
+    source = os.path.join(workdir, f'customers_{rows}.csv')
+    cache_dir = os.path.join(workdir, 'cache')
+    synthesize(rows).to_csv(source)
+
+    # 데이터 로딩: CSV -> Feather 변환(콜드)과 캐시 로딩(웜)
+    seconds, _ = timed(lambda: build_cache(source, cache_dir), 1)
+    record('load.csv_to_feather', seconds, rows)
+    seconds, data = timed(lambda: load_customer_data(source, cache_dir), repeat)
+    record('load.feather_cached', seconds, rows)
+
+    # 집계: 차원별 group-by 와 전체 집계
+    data = add_derived_features(data)
+    for dim in DIMENSIONS:
+        seconds, _ = timed(lambda: group_stats(data, dim), repeat)
+        record(f'aggregate.{dim}', seconds, rows)
+    for pair in PAIRS:
+        seconds, _ = timed(lambda: group_stats(data, list(pair)), repeat)
+        record(f"aggregate.{' x '.join(pair)}", seconds, rows)
+    seconds, _ = timed(lambda: compute_aggregates(data), repeat)
+    record('aggregate.all', seconds, rows)
+
+    # 예측: 한 행씩 호출 vs 청크 단위 일괄 호출
+    features = data[FEATURE_COLUMNS]
+    count = min(single_rows, rows)
+
+    def predict_single():
+        for i in range(count):
+            model.predict(features.iloc[i:i + 1])
+
+    seconds, _ = timed(predict_single, 1)
+    record('predict.single_row', seconds, count)
+
+    count = min(predict_rows, rows) if predict_rows else rows
+    seconds, _ = timed(lambda: predict_in_chunks(model, features.iloc[:count]), 1)
+    record('predict.batch', seconds, count)
+
+    # 내보낸 NumPy 점수 계산기: 같은 입력으로 속도와 sklearn 과의 일치 여부 확인
+    scorer = FastScorer.from_pipeline(model)
+    seconds, _ = timed(lambda: predict_in_chunks(scorer, features.iloc[:count]), 1)
+    record('predict.batch_fast', seconds, count)
+    mismatches = verify(model, scorer, features.iloc[:count])
+    if mismatches:
+        raise SystemExit(f"fast_scorer 예측이 sklearn 과 {mismatches:,}행 다릅니다.")
+    return results
+
+def compare(current, baseline_path):
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)
+    previous = {(r['name'], r['rows']): r['seconds'] for r in baseline['results']}
+    print(f"\n기준 결과({baseline.get('commit')}) 대비 비율 (1.0 보다 크면 느려짐)")
+    for r in current['results']:
+        key = (r['name'], r['rows'])
+        if key in previous and previous[key]:
+            ratio = r['seconds'] / previous[key]
+            flag = '  <-- 느려짐' if ratio > 1.1 else ''
+            print(f"  {r['name']:<36} {r['rows']:>11,}  x{ratio:.2f}{flag}")
+
+def main():
+    parser = argparse.ArgumentParser(description="데이터 로딩 / 집계 / 예측 성능 측정")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help="측정할 데이터 행 수")
+    parser.add_argument('--repeat', type=int, default=3, help="반복 측정 횟수 (최솟값 사용)")
+    parser.add_argument('--single-rows', type=int, default=200, help="한 행씩 예측할 행 수")
+    parser.add_argument('--predict-rows', type=int, default=0, help="일괄 예측할 최대 행 수 (0: 전체)")
+    parser.add_argument('--output', default=None, help="결과 JSON 경로")
+    parser.add_argument('--compare', default=None, help="비교할 이전 결과 JSON")
+    args = parser.parse_args()
+
+    commit = git_commit()
+    model = load_model()
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for rows in args.sizes:
+            print(f"[{rows:,} rows]")
+            results.extend(run_size(rows, model, workdir, args.repeat, args.single_rows, args.predict_rows))
+
+    report = {
+        'commit': commit,
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'results': results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"{datetime.now():%Y%m%d_%H%M%S}_{commit}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n결과 저장: {output}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,230 @@
+import argparse
+import json
+import os
+import re
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from ui.aggregates import compute_aggregates
+from ui.data_store import FLOAT_COLUMNS, INTEGER_COLUMNS, SOURCE_PATH
+from ui.out_of_core import BACKENDS, compute_aggregates_out_of_core
+from ui.scoring import DEFAULT_CHUNK_SIZE, MODEL_PATH, NUMERIC_FEATURES, load_model, predict_in_chunks
+from ui.segments import recommend, segment_profiles
+
+# Streamlit 없이 실행하는 배치 작업용 명령줄 도구
+#   python cli.py score data/shopping_trends.csv data/scored.parquet
+#   python cli.py score data/shopping_trends.csv data/campaign.csv --campaign
+#   python cli.py report data/customer_data.csv --output-dir reports
+
+def _is_parquet(path):
+    return os.path.splitext(path)[1].lower() in ('.parquet', '.pq')
+
+def iter_input(path, chunk_size):
+    # 모든 컬럼을 chunk_size 행씩 읽는다 (메모리 사용량은 청크 크기로 제한)
+    # CSV 는 모든 값을 문자열로 읽어 청크마다 타입 추론이 달라지지 않게 하고, 수치형 변환은 예측/저장 단계에서 한다
+    if _is_parquet(path):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size, dtype=str)
+
+class OutputWriter:
+    # 청크를 받는 순서대로 CSV / Parquet 파일에 이어 쓴다
+
+    def __init__(self, path):
+        self.path = path
+        self.rows = 0
+        self._tmp_path = f'{path}.{os.getpid()}.tmp'
+        self._parquet = None
+
+    def _arrow_type(self, name, values):
+        # Parquet 스키마는 값이 아니라 컬럼 정의로 정한다 (첫 청크가 비어 있거나 정수뿐이어도 같은 타입)
+        import pyarrow as pa
+
+        if name in INTEGER_COLUMNS:
+            return pa.int64()
+        if name in FLOAT_COLUMNS:
+            return pa.float64()
+        if pd.api.types.is_numeric_dtype(values.dtype) or pd.api.types.is_bool_dtype(values.dtype):
+            # Parquet 입력의 나머지 수치형 컬럼은 입력 파일의 타입을 그대로 (모든 청크가 같은 타입)
+            return pa.Array.from_pandas(values.iloc[:0]).type
+        return pa.string()
+
+    def _schema(self, chunk):
+        import pyarrow as pa
+
+        return pa.schema([(name, self._arrow_type(name, chunk[name])) for name in chunk.columns])
+
+    def _coerce_numeric(self, chunk):
+        # 정수/실수로 정의된 컬럼을 변환. 저장할 수 없는 값은 빈 값으로 바꾸지 않고 바로 실패한다
+        # (예외: 특성 컬럼의 숫자가 아닌 값은 예측도 건너뛴 행이라 Cluster 와 함께 빈 값으로 저장)
+        values = {}
+        for col in chunk.columns:
+            if col not in INTEGER_COLUMNS and col not in FLOAT_COLUMNS:
+                continue
+            raw = chunk[col]
+            numeric = pd.to_numeric(raw, errors='coerce')
+            invalid = numeric.notna() & (numeric != numeric.round()) if col in INTEGER_COLUMNS else pd.Series(False, index=raw.index)
+            if col not in NUMERIC_FEATURES:
+                invalid |= numeric.isna() & raw.notna()
+            positions = np.flatnonzero(invalid.to_numpy())
+            if len(positions):
+                row = positions[0]
+                raise ValueError(f"{col} 컬럼에 저장할 수 없는 값이 있습니다: {self.rows + row + 1:,}번째 행 {raw.iloc[row]!r} "
+                                 f"(총 {len(positions):,}개, 정수 컬럼은 소수를 허용하지 않음)")
+            values[col] = numeric.astype('Int64' if col in INTEGER_COLUMNS else 'Float64')
+        return chunk.assign(**values)
+
+    def write(self, chunk):
+        if _is_parquet(self.path):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self._tmp_path, self._schema(chunk))
+            table = pa.Table.from_pandas(self._coerce_numeric(chunk), schema=self._parquet.schema, preserve_index=False)
+            self._parquet.write_table(table)
+        else:
+            chunk.to_csv(self._tmp_path, mode='a' if self.rows else 'w', header=not self.rows, index=False)
+        self.rows += len(chunk)
+
+    def close(self, commit=True):
+        # 실패한 작업은 임시 파일을 지워 일부만 쓴 결과가 출력 파일로 남지 않게 한다
+        if self._parquet is not None:
+            self._parquet.close()
+        if os.path.exists(self._tmp_path):
+            if commit:
+                os.replace(self._tmp_path, self.path)
+            else:
+                os.remove(self._tmp_path)
+
+_model = None
+
+def _init_worker(model_path):
+    # 워커마다 모델을 한 번만 불러온다 (내보낸 NumPy 점수 계산기가 있으면 그것을 사용)
+    global _model
+    from ui.fast_scorer import load_scorer_for
+
+    _model = load_scorer_for(model_path) or load_model(model_path)
+
+def _score_chunk(chunk):
+    return predict_in_chunks(_model, chunk, chunk_size=len(chunk) or 1).to_numpy()
+
+def campaign_profiles(reference_path=SOURCE_PATH, backend='chunked'):
+    # 기준 고객 파일(Cluster 포함)을 집계해 군집별 마케팅 전략 / 인기 상품 / 선호 계절 표를 만든다
+    return segment_profiles(compute_aggregates_out_of_core(reference_path, backend))
+
+def score(input_path, output_path, workers=None, chunk_size=DEFAULT_CHUNK_SIZE, model_path=MODEL_PATH, profiles=None):
+    # 입력을 청크 단위로 읽어 여러 프로세스에서 예측하고, 입력 순서대로 Cluster 컬럼을 붙여 저장
+    # profiles 가 있으면 고객 유형 / 마케팅 전략 / 인기 상품 / 선호 계절 컬럼도 붙인다 (캠페인 대상 파일)
+    workers = workers or os.cpu_count() or 1
+    writer = OutputWriter(output_path)
+    start = time.perf_counter()
+    skipped = 0
+    completed = False
+
+    def drain(pending):
+        nonlocal skipped
+        chunk, future = pending.popleft()
+        clusters = pd.Series(future.result(), index=chunk.index, dtype='Int64')
+        skipped += int(clusters.isna().sum())
+        chunk = chunk.assign(Cluster=clusters)
+        if profiles is not None:
+            chunk = pd.concat([chunk, recommend(clusters, profiles)], axis=1)
+        writer.write(chunk)
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(model_path,)) as pool:
+            # 동시에 처리 중인 청크 수를 제한해 메모리 사용량을 일정하게 유지
+            pending = deque()
+            for chunk in iter_input(input_path, chunk_size):
+                pending.append((chunk, pool.submit(_score_chunk, chunk)))
+                if len(pending) >= workers * 2:
+                    drain(pending)
+            while pending:
+                drain(pending)
+        completed = True
+    finally:
+        writer.close(completed)
+
+    return {'rows': writer.rows, 'skipped': skipped, 'seconds': time.perf_counter() - start, 'workers': workers}
+
+def _table_name(key):
+    name = '__'.join(key) if isinstance(key, tuple) else key
+    return re.sub(r'[^0-9A-Za-z]+', '_', name).strip('_').lower()
+
+def report(input_path, output_dir, formats=('parquet', 'json'), backend='chunked', chunk_size=500_000):
+    # 데이터 분석 페이지와 같은 집계 테이블을 파일로 저장
+    start = time.perf_counter()
+    if backend == 'memory':
+        from ui.data_store import load_customer_data
+
+        aggs = compute_aggregates(load_customer_data(input_path))
+    else:
+        aggs = compute_aggregates_out_of_core(input_path, backend, chunk_size)
+    elapsed = time.perf_counter() - start
+
+    os.makedirs(output_dir, exist_ok=True)
+    tables = {key: table for key, table in aggs.items() if isinstance(table, pd.DataFrame)}
+    if 'parquet' in formats:
+        for key, table in tables.items():
+            table.reset_index().to_parquet(os.path.join(output_dir, f'{_table_name(key)}.parquet'), index=False)
+    if 'json' in formats:
+        payload = {
+            'source': input_path,
+            'rows': int(aggs['rows']),
+            'tables': {_table_name(key): json.loads(table.reset_index().to_json(orient='records', force_ascii=False))
+                       for key, table in tables.items()},
+        }
+        with open(os.path.join(output_dir, 'aggregates.json'), 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False, indent=2)
+
+    return {'rows': int(aggs['rows']), 'tables': len(tables), 'seconds': elapsed, 'backend': backend}
+
+def _print_throughput(summary):
+    rate = summary['rows'] / summary['seconds'] if summary['seconds'] else 0
+    print(f"  {summary['rows']:,}행 / {summary['seconds']:.2f}초 ({rate:,.0f} 행/초)")
+
+def main():
+    parser = argparse.ArgumentParser(description="의류 쇼핑몰 CRM 배치 작업 (Streamlit 없이 실행)")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    score_parser = sub.add_parser('score', help="고객 파일의 고객 유형(Cluster) 일괄 예측")
+    score_parser.add_argument('input', help="입력 CSV / Parquet (8개 특성 컬럼 포함)")
+    score_parser.add_argument('output', help="출력 CSV / Parquet (입력 컬럼 + Cluster)")
+    score_parser.add_argument('--workers', type=int, default=None, help="프로세스 수 (기본: 모든 코어)")
+    score_parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    score_parser.add_argument('--model', default=MODEL_PATH)
+    score_parser.add_argument('--campaign', action='store_true',
+                              help="고객 유형, 마케팅 전략, 인기 상품, 선호 계절 컬럼 추가")
+    score_parser.add_argument('--reference', default=SOURCE_PATH,
+                              help="인기 상품/선호 계절을 구할 기준 고객 파일 (Cluster 포함)")
+
+    report_parser = sub.add_parser('report', help="데이터 분석 페이지의 집계 테이블 저장")
+    report_parser.add_argument('input', help="Cluster 컬럼이 포함된 고객 CSV / Parquet")
+    report_parser.add_argument('--output-dir', default='reports')
+    report_parser.add_argument('--format', choices=['parquet', 'json', 'both'], default='both')
+    report_parser.add_argument('--backend', choices=BACKENDS, default='chunked')
+    report_parser.add_argument('--chunk-size', type=int, default=500_000)
+    args = parser.parse_args()
+
+    if args.command == 'score':
+        profiles = campaign_profiles(args.reference) if args.campaign else None
+        summary = score(args.input, args.output, args.workers, args.chunk_size, args.model, profiles)
+        print(f"{args.input} -> {args.output} (워커 {summary['workers']}개)")
+        if summary['skipped']:
+            print(f"  수치형 값이 올바르지 않아 예측하지 못한 행 {summary['skipped']:,}개")
+    else:
+        formats = ('parquet', 'json') if args.format == 'both' else (args.format,)
+        summary = report(args.input, args.output_dir, formats, args.backend, args.chunk_size)
+        print(f"{args.input} -> {args.output_dir} (집계 테이블 {summary['tables']}개, {summary['backend']})")
+    _print_throughput(summary)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+import pandas as pd
+
+from ui.features import DERIVED_COLUMNS, add_derived_features
+
+AMOUNT = 'Purchase Amount (USD)'
+RATING = 'Review Rating'
+
+# 대시보드에서 쓰는 단일 컬럼 집계
+DIMENSIONS = ['Gender', 'Preferred Payment Method', 'Age Group', 'Category', 'Location', 'Season', 'Item Purchased', 'Cluster',
+              'Spend Bucket', 'Loyalty Tier']
+# 두 컬럼 교차 집계 (군집별 인기 상품/선호 계절은 ui/segments.py 의 추천에 사용)
+PAIRS = [('Season', 'Category'), ('Cluster', 'Age Group'), ('Cluster', 'Item Purchased'), ('Cluster', 'Season')]
+# 집계 큐브 구성 버전. DIMENSIONS / PAIRS 를 바꾸면 올려서 공유 캐시(ui/shared_cache.py)를 다시 만들게 한다
+CUBE_VERSION = 2
+
+def group_stats(data, keys):
+    # 합칠 수 있는 값(건수, 합계)만 저장하고 평균은 화면에서 계산
+    grouped = data.groupby(keys, observed=True)
+    return pd.DataFrame({
+        'count': grouped.size(),
+        'amount_sum': grouped[AMOUNT].sum().astype('float64'),
+        'rating_sum': grouped[RATING].sum().astype('float64'),
+    })
+
+def compute_aggregates(data):
+    # 데이터 분석 페이지에 필요한 모든 group-by 를 한 번에 계산한 작은 테이블 묶음
+    if not all(col in data.columns for col in DERIVED_COLUMNS):
+        data = add_derived_features(data)
+
+    aggs = {'rows': len(data)}
+    for dim in DIMENSIONS:
+        if dim in data.columns:
+            aggs[dim] = group_stats(data, dim)
+    for pair in PAIRS:
+        if all(col in data.columns for col in pair):
+            aggs[pair] = group_stats(data, list(pair))
+    return aggs
+
+def merge_stats(left, right):
+    # 같은 키의 건수와 합계를 더해 두 집계 테이블을 합친다
+    if left is None:
+        return right
+    merged = left.add(right, fill_value=0)
+    merged['count'] = merged['count'].astype('int64')
+    return merged
+
+def mean_of(table, column):
+    return table[column] / table['count']
@@ -0,0 +1,65 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import streamlit as st
+
+# 예측, 로그 기록, 데이터/집계 로딩을 스크립트 스레드 밖에서 실행하는 스레드 수
+MAX_WORKERS = 4
+# 작업이 이 시간 안에 끝나면 자리 표시 없이 바로 결과를 보여준다
+DEFAULT_GRACE = 0.1
+POLL_INTERVAL = 0.5
+
+_executor = None
+# 실행 중인 작업 (같은 키로 다시 요청하면 새로 실행하지 않고 기다린다)
+_tasks = {}
+_lock = threading.Lock()
+
+def _get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='crm-background')
+        return _executor
+
+def run_in_background(key, func, *args, with_progress=False, **kwargs):
+    # func 을 스레드 풀에서 실행하고 Future 를 돌려준다
+    # key 가 있으면 같은 키의 작업이 실행 중일 때 그 작업을 그대로 공유 (여러 세션/재실행이 한 번만 계산)
+    # with_progress=True 이면 func 에 on_progress(done, total) 콜백을 넘기고 진행률을 Future 에 기록
+    with _lock:
+        running = _tasks.get(key) if key is not None else None
+        if running is not None:
+            if running.done():
+                # 끝난 작업은 목록에서 빼서 다음 요청은 (보통 캐시에서 바로) 다시 계산한다
+                del _tasks[key]
+            return running
+
+    state = {'progress': None}
+    if with_progress:
+        kwargs['on_progress'] = lambda done, total: state.update(progress=(done, total))
+    future = _get_executor().submit(func, *args, **kwargs)
+    future.state = state
+    if key is not None:
+        with _lock:
+            _tasks.setdefault(key, future)
+    return future
+
+def poll_task(future, message, grace=DEFAULT_GRACE):
+    # (끝났는지, 결과) 를 돌려준다. 아직이면 자리 표시를 그리고, 끝나는 순간 페이지를 다시 실행
+    wait([future], timeout=grace)
+    if future.done():
+        return True, future.result()
+
+    @st.fragment(run_every=POLL_INTERVAL)
+    def placeholder():
+        # 조각(fragment)만 주기적으로 다시 그려 세션의 나머지 화면은 멈추지 않는다
+        if future.done():
+            st.rerun()
+        progress = future.state['progress']
+        if progress:
+            done, total = progress
+            st.progress(done / total if total else 1.0, text=f"{message} {done:,} / {total:,}")
+        else:
+            st.info(f"⏳ {message}")
+
+    placeholder()
+    return False, None
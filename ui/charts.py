@@ -0,0 +1,26 @@
+import json
+
+import pandas as pd
+import plotly.graph_objects as go
+
+OTHER_LABEL = '기타'
+
+class SpecFigure(go.Figure):
+    # 캐시해 둔 그림 사양(JSON)으로 만든 읽기 전용 Figure
+    # st.plotly_chart 는 figure.to_dict() 를 직렬화하므로, 그림 객체를 다시 만들거나 복사/검증하지 않고 사양을 그대로 넘긴다
+
+    def __init__(self, spec):
+        super().__init__()
+        self._spec = json.loads(spec)
+
+    def to_dict(self):
+        return self._spec
+
+def top_n_with_other(series, n=15, other_label=OTHER_LABEL):
+    # 값이 큰 상위 n 개만 남기고 나머지는 '기타' 하나로 합친다
+    series = series.sort_values(ascending=False)
+    if len(series) <= n + 1:
+        return series
+    top = series.iloc[:n]
+    top.index = top.index.astype(str)
+    return pd.concat([top, pd.Series({other_label: series.iloc[n:].sum()})])
@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+
+# 값별 비트맵을 만들 범주형 컬럼 (데이터 분석 페이지에서 쓰는 컬럼)
+BITMAP_COLUMNS = ['Category', 'Season', 'Location', 'Cluster', 'Preferred Payment Method']
+# 범위 검색용 수치형 컬럼. 서로 다른 값이 MAX_RANGE_VALUES 이하이면 값별 비트맵으로 색인
+RANGE_COLUMNS = ['Age', 'Purchase Amount (USD)', 'Review Rating', 'Previous Purchases']
+MAX_RANGE_VALUES = 256
+
+# 바이트별 1 비트 개수
+_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+def _bitmap(mask):
+    # 행마다 1 비트 (행 수 / 8 바이트)
+    return np.packbits(mask)
+
+class CustomerIndex:
+    # Customer ID 정렬 색인 + 컬럼 값별 비트맵으로 전체 스캔 없이 고객을 찾는다
+
+    def __init__(self, data, bitmap_columns=BITMAP_COLUMNS, range_columns=RANGE_COLUMNS):
+        self.data = data
+        self.rows = len(data)
+
+        # Customer ID -> 행 위치 (정렬된 ID 에서 이진 탐색)
+        ids = data['Customer ID'].to_numpy()
+        self._id_order = np.argsort(ids, kind='stable')
+        self._sorted_ids = ids[self._id_order]
+
+        self.bitmaps = {}
+        for col in bitmap_columns + range_columns:
+            if col not in data.columns:
+                continue
+            codes, uniques = pd.factorize(data[col], sort=True)
+            if col in range_columns and len(uniques) > MAX_RANGE_VALUES:
+                continue
+            self.bitmaps[col] = {_plain(value): _bitmap(codes == code) for code, value in enumerate(uniques)}
+        self._all = _bitmap(np.ones(self.rows, dtype=bool))
+
+    def lookup(self, customer_id):
+        # 해당 고객의 행 위치 (없으면 None)
+        pos = np.searchsorted(self._sorted_ids, customer_id)
+        if pos < len(self._sorted_ids) and self._sorted_ids[pos] == customer_id:
+            return int(self._id_order[pos])
+        return None
+
+    def get(self, customer_id):
+        pos = self.lookup(customer_id)
+        return None if pos is None else self.data.iloc[pos]
+
+    def values(self, col):
+        return list(self.bitmaps.get(col, {}))
+
+    def value_range(self, col):
+        values = self.values(col)
+        return (min(values), max(values)) if values else (None, None)
+
+    def _any_of(self, col, values):
+        result = np.zeros_like(self._all)
+        for value in values:
+            bitmap = self.bitmaps[col].get(value)
+            if bitmap is not None:
+                result |= bitmap
+        return result
+
+    def filter(self, equals=None, ranges=None):
+        # 같은 컬럼 안의 값은 OR, 컬럼끼리는 AND. 비어 있는 조건은 무시
+        result = self._all.copy()
+        for col, values in (equals or {}).items():
+            if values:
+                result &= self._any_of(col, values)
+        for col, (low, high) in (ranges or {}).items():
+            if col in self.bitmaps:
+                result &= self._any_of(col, [v for v in self.bitmaps[col] if low <= v <= high])
+            else:
+                # 색인하지 않은 컬럼은 직접 비교
+                values = self.data[col].to_numpy()
+                result &= _bitmap((values >= low) & (values <= high))
+        return result
+
+    @staticmethod
+    def count(bitmap):
+        return int(_POPCOUNT[bitmap].sum(dtype=np.int64))
+
+    def positions(self, bitmap, offset=0, limit=50):
+        # offset 번째부터 limit 개 행 위치. 해당 구간의 바이트만 풀어서 찾는다
+        cumulative = np.cumsum(_POPCOUNT[bitmap], dtype=np.int64)
+        if not len(cumulative) or offset >= cumulative[-1]:
+            return np.array([], dtype=np.int64)
+        first = int(np.searchsorted(cumulative, offset, side='right'))
+        last = int(np.searchsorted(cumulative, offset + limit, side='left')) + 1
+        skip = offset - (int(cumulative[first - 1]) if first else 0)
+        rows = np.flatnonzero(np.unpackbits(bitmap[first:last])) + first * 8
+        return rows[skip:skip + limit]
+
+    def search(self, equals=None, ranges=None, page=0, page_size=50):
+        # (현재 페이지 행, 전체 일치 건수)
+        bitmap = self.filter(equals, ranges)
+        rows = self.positions(bitmap, page * page_size, page_size)
+        return self.data.iloc[rows], self.count(bitmap)
+
+def _plain(value):
+    # numpy 스칼라를 파이썬 값으로 (선택 위젯과 비교하기 쉽도록). float32 는 표시 오차를 없앤다
+    if isinstance(value, (float, np.floating)):
+        return round(float(value), 4)
+    return value.item() if isinstance(value, np.generic) else value
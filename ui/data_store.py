@@ -0,0 +1,127 @@
+import hashlib
+import json
+import os
+
+import pandas as pd
+import pyarrow.feather as feather
+
+from ui.features import add_derived_features
+
+SOURCE_PATH = 'data/customer_data.csv'
+CACHE_DIR = 'data/cache'
+
+# 반복되는 문자열 컬럼은 category 로 저장
+CATEGORICAL_COLUMNS = [
+    'Gender', 'Item Purchased', 'Category', 'Location', 'Size', 'Color', 'Season',
+    'Subscription Status', 'Payment Method', 'Shipping Type', 'Discount Applied',
+    'Promo Code Used', 'Preferred Payment Method', 'Frequency of Purchases',
+]
+INTEGER_COLUMNS = ['Customer ID', 'Age', 'Purchase Amount (USD)', 'Previous Purchases', 'Cluster']
+FLOAT_COLUMNS = ['Review Rating']
+
+def cache_paths(source=SOURCE_PATH, cache_dir=CACHE_DIR):
+    name = os.path.splitext(os.path.basename(source))[0]
+    return os.path.join(cache_dir, f'{name}.feather'), os.path.join(cache_dir, f'{name}.meta.json')
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def read_source_csv(source=SOURCE_PATH):
+    # 기본 C 파서로 읽고, 형식이 깨진 파일일 때만 느린 python 파서로 재시도
+    try:
+        data = pd.read_csv(source, index_col=0)
+    except pd.errors.ParserError:
+        data = pd.read_csv(source, index_col=0, engine='python', on_bad_lines='skip', sep=',', quotechar='"', escapechar='\\')
+    return optimize_dtypes(data)
+
+def optimize_dtypes(data):
+    data = data.copy()
+    for col in CATEGORICAL_COLUMNS:
+        if col in data.columns:
+            data[col] = data[col].astype('category')
+    for col in INTEGER_COLUMNS:
+        if col in data.columns:
+            values = pd.to_numeric(data[col], errors='coerce')
+            if values.isna().any():
+                data[col] = values.astype('float32')
+            else:
+                data[col] = pd.to_numeric(values, downcast='integer')
+    for col in FLOAT_COLUMNS:
+        if col in data.columns:
+            data[col] = pd.to_numeric(data[col], errors='coerce').astype('float32')
+    return data
+
+def _read_meta(meta_path):
+    try:
+        with open(meta_path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _write_atomic(path, write):
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+def build_cache(source=SOURCE_PATH, cache_dir=CACHE_DIR):
+    # CSV 를 한 번 파싱해 타입이 지정된 Feather(비압축: 읽을 때 압축 해제가 없다) 파일로 저장
+    os.makedirs(cache_dir, exist_ok=True)
+    cache_path, meta_path = cache_paths(source, cache_dir)
+    stat = os.stat(source)
+    data = read_source_csv(source)
+
+    _write_atomic(cache_path, lambda p: feather.write_feather(data, p, compression='uncompressed'))
+    meta = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'sha256': file_hash(source)}
+    _write_atomic(meta_path, lambda p: _dump_json(meta, p))
+    return data, meta
+
+def _dump_json(obj, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(obj, f)
+
+def _cache_meta(source, cache_dir):
+    # 캐시가 원본과 일치하면 메타 정보를, 아니면 None 을 돌려준다
+    cache_path, meta_path = cache_paths(source, cache_dir)
+    meta = _read_meta(meta_path)
+    if meta is None or not os.path.exists(cache_path):
+        return None
+
+    stat = os.stat(source)
+    if meta.get('mtime_ns') == stat.st_mtime_ns and meta.get('size') == stat.st_size:
+        return meta
+
+    # mtime 만 바뀐 경우(복사, touch 등)는 해시로 확인
+    if meta.get('size') == stat.st_size and meta.get('sha256') == file_hash(source):
+        meta = dict(meta, mtime_ns=stat.st_mtime_ns)
+        _write_atomic(meta_path, lambda p: _dump_json(meta, p))
+        return meta
+    return None
+
+def file_version(source=SOURCE_PATH):
+    # 전체 해시를 구하기 어려운 대용량 파일용 버전 (수정 시각 + 크기)
+    stat = os.stat(source)
+    return f'{stat.st_mtime_ns:x}-{stat.st_size:x}'
+
+def dataset_version(source=SOURCE_PATH, cache_dir=CACHE_DIR):
+    meta = _cache_meta(source, cache_dir)
+    if meta is None:
+        _, meta = build_cache(source, cache_dir)
+    return meta['sha256'][:16]
+
+def load_customer_data(source=SOURCE_PATH, cache_dir=CACHE_DIR):
+    # 파생 컬럼(연령대, 구매 금액 구간, 충성도 등급)은 로드 시점에 한 번만 계산
+    cache_path, _ = cache_paths(source, cache_dir)
+    if _cache_meta(source, cache_dir) is None:
+        data, _ = build_cache(source, cache_dir)
+    else:
+        # 파생 컬럼을 붙이며 새 프레임을 만드므로 mmap 없이 한 번에 읽는다 (to_pandas 가 어차피 전체를 복사)
+        data = feather.read_table(cache_path).to_pandas()
+    return add_derived_features(data)
+
+if __name__ == '__main__':
+    data, meta = build_cache()
+    print(f"{SOURCE_PATH} -> {cache_paths()[0]} ({len(data):,} rows, sha256 {meta['sha256'][:16]})")
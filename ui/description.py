@@ -1,18 +1,7 @@
 import streamlit as st
-import pandas as pd
-from PIL import Image
+from PIL import Image  # Pillow 라이브러리에서 Image 클래스 import
 
-from ui.eda import analyze_gender_counts  # Pillow 라이브러리에서 Image 클래스 import
-
-@st.cache_data
-def load_data():
-    try:
-        data = pd.read_csv('data/customer_data.csv', index_col=0, engine='python', on_bad_lines='skip', sep=',', quotechar='"', escapechar='\\')
-        data['Previous Purchases'] = pd.to_numeric(data['Previous Purchases'], errors='coerce')
-        return data
-    except Exception as e:
-        st.error(f"데이터 로딩 중 오류 발생: {e}")
-        return None
+from ui.eda import analyze_gender_counts, load_aggregates, load_data
 
 def app_description():
     st.title("👔 의류 쇼핑몰 CRM 📊")
@@ -79,8 +68,9 @@ def app_description():
     st.markdown("다양한 시각화 기법을 통해 고객 데이터에서 유용한 인사이트를 도출합니다.")
     st.markdown("- 다음은 데이터 분석 탭에서 보여드리는 차트 예시입니다.")
 
-    if data is not None:
-        analyze_gender_counts(data)
+    aggs = load_aggregates()
+    if aggs is not None:
+        analyze_gender_counts(aggs)
     else:
         st.error("데이터를 불러오는 데 실패했습니다.")
 
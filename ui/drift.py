@@ -0,0 +1,100 @@
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+from ui.drift_stats import (DRIFT_COLUMNS, SECONDS_PER_DAY, DriftTracker, baseline_counts, legacy, psi, psi_level,
+                            rolling_counts, shares, window_counts, window_feature_means)
+from ui.eda import load_aggregates
+from ui.instrumentation import measure
+from ui.scoring import NUMERIC_FEATURES
+from ui.segments import segment_label
+
+WINDOW_OPTIONS = [7, 30, 90]
+COLUMN_LABELS = {
+    'Cluster': "고객 유형",
+    'Age Group': "연령대",
+    'Spend Bucket': "구매 금액 구간",
+    'Loyalty Tier': "충성도 등급",
+}
+
+@st.cache_resource
+def get_drift_tracker():
+    # 모든 세션이 같은 집계기를 공유하고, 새로 기록된 로그 행만 더한다
+    return DriftTracker()
+
+def _day_labels(index):
+    return pd.to_datetime(index * SECONDS_PER_DAY, unit='s').strftime('%Y-%m-%d')
+
+def segment_drift_page():
+    st.title("📉 고객 유형 변화 분석")
+    st.markdown("예측 로그에 쌓인 신규 고객의 고객 유형 구성이 기존 고객(`customer_data.csv`)과 얼마나 달라졌는지 확인합니다.")
+
+    aggs = load_aggregates()
+    if aggs is None:
+        return
+
+    tracker = get_drift_tracker()
+    with measure('drift_tracker.refresh'):
+        tracker.refresh()
+    snapshot = tracker.snapshot()
+    daily = snapshot['daily']
+    if 'Cluster' not in daily:
+        st.info("아직 예측된 신규 고객이 없습니다.")
+        return
+
+    days = st.select_slider("비교 기간 (최근 N일)", WINDOW_OPTIONS, value=30)
+
+    window = window_counts(daily['Cluster'], days)
+    baseline = baseline_counts(aggs, 'Cluster')
+    col1, col2, col3 = st.columns(3)
+    col1.metric("예측 로그 고객 수", f"{snapshot['rows']:,}")
+    col2.metric(f"최근 {days}일 고객 수", f"{int(window.sum()):,}")
+    if window.sum():
+        cluster_psi = psi(window, baseline)
+        col3.metric("고객 유형 PSI", f"{cluster_psi:.3f}", psi_level(cluster_psi), delta_color='off')
+
+    # 고객 유형별 비율: 기존 고객 / 이전 CSV 로그 / 최근 N일
+    share_table = pd.DataFrame({"기존 고객": shares(baseline), f"최근 {days}일": shares(window)})
+    legacy_counts = legacy(daily['Cluster']).sum()
+    if legacy_counts.sum():
+        share_table["이전 예측 기록"] = shares(legacy_counts)
+    share_table = share_table.fillna(0).sort_index()
+    share_table.index = [segment_label(c) for c in share_table.index]
+    fig = px.bar(share_table, barmode='group', labels={'index': '고객 유형', 'value': '비율', 'variable': '구분'},
+                 title='고객 유형별 비율 비교')
+    fig.update_layout(yaxis_tickformat='.0%')
+    st.plotly_chart(fig, key='drift_share_chart')
+
+    # 날짜마다 최근 N일 창의 PSI (분포별)
+    psi_by_day = pd.DataFrame({
+        COLUMN_LABELS[col]: psi(rolling_counts(daily[col], days), baseline_counts(aggs, col))
+        for col in DRIFT_COLUMNS if col in daily and col in aggs
+    })
+    if len(psi_by_day):
+        psi_by_day.index = _day_labels(psi_by_day.index)
+        fig = px.line(psi_by_day, labels={'index': '날짜', 'value': 'PSI', 'variable': '분포'},
+                      title=f'최근 {days}일 창의 PSI 추이 (0.1 주의, 0.25 큰 변화)')
+        st.plotly_chart(fig, key='drift_psi_chart')
+
+        daily_share = shares(rolling_counts(daily['Cluster'], days))
+        daily_share.index = _day_labels(daily_share.index)
+        daily_share.columns = [segment_label(c) for c in daily_share.columns]
+        fig = px.area(daily_share, labels={'index': '날짜', 'value': '비율', 'variable': '고객 유형'},
+                      title=f'최근 {days}일 창의 고객 유형 비율 추이')
+        fig.update_layout(yaxis_tickformat='.0%')
+        st.plotly_chart(fig, key='drift_daily_share_chart')
+
+    # 고객 유형별 특성 평균: 최근 N일 vs 기존 고객 (구매 금액과 리뷰 평점은 집계 큐브에 합계가 있다)
+    if snapshot['feature_sums'] is not None:
+        means = window_feature_means(snapshot['feature_sums'], days)
+        if len(means):
+            st.subheader(f"고객 유형별 특성 평균 (최근 {days}일)")
+            base = aggs['Cluster']
+            base = base.set_axis(base.index.astype(int))
+            means = means.rename(columns={'count': '고객 수'})
+            means['기존 평균 구매 금액'] = (base['amount_sum'] / base['count']).reindex(means.index)
+            means['기존 평균 리뷰 평점'] = (base['rating_sum'] / base['count']).reindex(means.index)
+            means.index = [segment_label(c) for c in means.index]
+            st.dataframe(means[['고객 수'] + NUMERIC_FEATURES + ['기존 평균 구매 금액', '기존 평균 리뷰 평점']].round(2))
+
+    st.caption(f"예측 로그 {snapshot['rows']:,}건 반영 (마지막 기록 번호 {snapshot['last_id']:,})")
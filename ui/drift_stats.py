@@ -0,0 +1,132 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from ui.features import add_derived_features
+from ui.prediction_log import get_prediction_log
+from ui.scoring import NUMERIC_FEATURES
+
+SECONDS_PER_DAY = 86_400
+# 시각 정보가 없는 이전 CSV 로그 행 (logged_at = 0) 은 별도 코호트로 모은다
+LEGACY_DAY = -1
+# 군집 비율과 함께 분포 변화를 볼 구간 컬럼 (ui/features.py 의 구간 정의를 그대로 사용)
+DRIFT_COLUMNS = ['Cluster', 'Age Group', 'Spend Bucket', 'Loyalty Tier']
+# PSI 계산에서 비율이 0 인 칸에 쓰는 최소값
+PSI_EPSILON = 1e-4
+
+def _add(left, right):
+    if left is None:
+        return right
+    return left.add(right, fill_value=0)
+
+class DriftTracker:
+    # 예측 로그를 tail 하면서 날짜별 히스토그램(군집, 연령대, 구매 금액 구간, 충성도 등급)과
+    # 날짜 x 군집별 수치형 특성 합계만 갱신한다. 화면에서는 이 작은 테이블로 비율/평균/PSI 를 계산
+
+    def __init__(self, log=None, chunk_size=100_000):
+        self.log = log or get_prediction_log()
+        self.chunk_size = chunk_size
+        self.last_id = 0
+        self.rows = 0
+        self.daily = {}
+        self.feature_sums = None
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        with self._lock:
+            added = 0
+            for rows, last_id in self.log.iter_since(self.last_id, self.chunk_size):
+                added += self._fold(rows)
+                self.last_id = last_id
+            self.rows += added
+            return added
+
+    def _fold(self, rows):
+        rows = rows.dropna(subset=['Cluster'])
+        if rows.empty:
+            return 0
+        logged_at = rows['logged_at'].to_numpy()
+        day = np.where(logged_at > 0, logged_at // SECONDS_PER_DAY, LEGACY_DAY).astype(np.int64)
+        rows = add_derived_features(rows).assign(Day=day, Cluster=rows['Cluster'].astype(np.int64))
+
+        for col in DRIFT_COLUMNS:
+            counts = rows.groupby(['Day', col], observed=True).size().unstack(fill_value=0)
+            if col != 'Cluster':
+                counts.columns = counts.columns.astype(str)
+            self.daily[col] = _add(self.daily.get(col), counts)
+
+        grouped = rows.groupby(['Day', 'Cluster'])
+        sums = grouped[NUMERIC_FEATURES].sum().astype('float64').assign(count=grouped.size())
+        self.feature_sums = _add(self.feature_sums, sums)
+        return len(rows)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'daily': {col: table.copy() for col, table in self.daily.items()},
+                'feature_sums': None if self.feature_sums is None else self.feature_sums.copy(),
+                'rows': self.rows,
+                'last_id': self.last_id,
+            }
+
+def dated(table):
+    # 이전 CSV 코호트를 뺀 날짜별 행
+    return table[table.index.get_level_values(0) != LEGACY_DAY]
+
+def legacy(table):
+    return table[table.index.get_level_values(0) == LEGACY_DAY]
+
+def rolling_counts(daily, days):
+    # 빈 날짜를 0 으로 채운 뒤 최근 days 일 합계를 날짜마다 계산
+    daily = dated(daily)
+    if daily.empty:
+        return daily
+    full_range = np.arange(daily.index.min(), daily.index.max() + 1)
+    return daily.reindex(full_range, fill_value=0).rolling(days, min_periods=1).sum()
+
+def window_counts(daily, days):
+    # 마지막 기록일까지 최근 days 일의 합계
+    daily = dated(daily)
+    if daily.empty:
+        return pd.Series(dtype='float64')
+    return daily[daily.index > daily.index.max() - days].sum()
+
+def shares(counts):
+    # 행(또는 Series) 별 비율
+    if isinstance(counts, pd.DataFrame):
+        return counts.div(counts.sum(axis=1).replace(0, np.nan), axis=0)
+    total = counts.sum()
+    return counts / total if total else counts
+
+def psi(actual, expected, epsilon=PSI_EPSILON):
+    # Population Stability Index = sum((p - q) * ln(p / q)). actual 은 Series 또는 날짜별 DataFrame
+    labels = expected.index.union(actual.index if isinstance(actual, pd.Series) else actual.columns)
+    q = shares(expected.reindex(labels, fill_value=0)).clip(lower=epsilon)
+    if isinstance(actual, pd.Series):
+        p = shares(actual.reindex(labels, fill_value=0)).clip(lower=epsilon)
+        return float(((p - q) * np.log(p / q)).sum())
+    p = shares(actual.reindex(columns=labels, fill_value=0)).clip(lower=epsilon)
+    return ((p - q) * np.log(p / q)).sum(axis=1).where(actual.sum(axis=1) > 0)
+
+def psi_level(value):
+    # 흔히 쓰는 기준: 0.1 미만 안정, 0.25 미만 주의, 그 이상 큰 변화
+    if value < 0.1:
+        return "안정"
+    if value < 0.25:
+        return "주의"
+    return "큰 변화"
+
+def baseline_counts(aggs, col):
+    # 기준 분포는 원본 CSV 대신 대시보드 집계 큐브에서 가져온다
+    counts = aggs[col]['count']
+    return counts.set_axis(counts.index.astype(np.int64 if col == 'Cluster' else str))
+
+def window_feature_means(feature_sums, days):
+    # 최근 days 일 동안의 군집별 수치형 특성 평균
+    sums = dated(feature_sums)
+    if sums.empty:
+        return sums
+    last_day = sums.index.get_level_values(0).max()
+    recent = sums[sums.index.get_level_values(0) > last_day - days].groupby(level='Cluster').sum()
+    return recent[NUMERIC_FEATURES].div(recent['count'], axis=0).assign(count=recent['count'])
@@ -2,157 +2,294 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 
-@st.cache_data
+from ui.aggregates import CUBE_VERSION, compute_aggregates, mean_of
+from ui.background import run_in_background
+from ui.charts import OTHER_LABEL, SpecFigure, top_n_with_other
+from ui.data_store import SOURCE_PATH, dataset_version, file_version, load_customer_data
+from ui.instrumentation import cache_miss, measure, timed
+from ui.live_stats import LiveAggregator
+from ui.out_of_core import compute_aggregates_out_of_core, dashboard_backend
+from ui.segments import SEGMENTS, segment_label, segment_profiles
+from ui.shared_cache import get_shared_cache
+
+# 위치별 차트에 막대로 모두 보여주는 최대 위치 수 (넘으면 상위 항목 + 기타)
+MAX_LOCATIONS = 60
+
+@timed(cached=True)
 def load_data():
     try:
-        data = pd.read_csv('data/customer_data.csv', index_col=0, engine='python', on_bad_lines='skip', sep=',', quotechar='"', escapechar='\\')
-        data['Previous Purchases'] = pd.to_numeric(data['Previous Purchases'], errors='coerce')
-        return data
+        # 원본 CSV 의 버전(해시)을 캐시 키로 사용해 파일이 바뀌면 자동으로 다시 읽는다
+        # 캐시된 프레임을 복사하지 않고 얕은 복사본(뷰)만 돌려준다
+        # pandas 3 의 Copy-on-Write 덕분에 호출한 쪽에서 수정해도 캐시된 원본은 바뀌지 않는다
+        return _load_data(dataset_version()).copy(deep=False)
     except Exception as e:
         st.error(f"데이터 로딩 중 오류 발생: {e}")
         return None
 
-# 클러스터 번호별 고객유형 이름
-customer_type_names = {
-    0: "고액 소비 VIP 고객",
-    1: "젊은 신규 고객",
-    2: "중간 소비 젊은 고객",
-    3: "중년층 충성 고객",
-    4: "보수적인 중장년층 고객",
-    5: "가격에 민감한 중년층 고객"
-}
-
-def show_customer_types(data):
-    if "Cluster" in data.columns:
+@st.cache_resource(max_entries=2)
+def _load_data(version):
+    # 타입이 지정된 Feather 캐시를 읽고, 원본 CSV 가 바뀐 경우에만 다시 변환
+    # CRM_CACHE_BACKEND=disk|shm 이면 파생 컬럼까지 붙인 결과를 같은 호스트의 모든 프로세스가 공유
+    cache_miss()
+    shared = get_shared_cache()
+    with measure('load_customer_data'):
+        if shared is not None:
+            return shared.frame('customers', version, load_customer_data)
+        return load_customer_data()
+
+def _aggregates_version(backend):
+    # memory 방식은 원본 해시, 스트리밍 방식은 전체 해시 대신 수정 시각 + 크기
+    # (dataset_version 은 캐시가 없거나 원본이 바뀌면 CSV 파싱 + Feather 변환 + 해시까지 하므로 무겁다)
+    return dataset_version() if backend == 'memory' else file_version(SOURCE_PATH)
+
+@timed(cached=True)
+def load_aggregates():
+    try:
+        # CRM_DASHBOARD_BACKEND=chunked|duckdb 이면 원본을 메모리에 올리지 않고 스트리밍으로 집계
+        backend = dashboard_backend()
+        return _load_aggregates(_aggregates_version(backend), backend)
+    except Exception as e:
+        st.error(f"데이터 집계 중 오류 발생: {e}")
+        return None
+
+def load_aggregates_async():
+    # 집계를 백그라운드 스레드에서 시작하고 Future 를 돌려준다 (페이지는 먼저 그리고 결과는 나중에 채운다)
+    # 스크립트 스레드에서는 파일 상태(stat)만 확인하고, 버전 계산과 캐시 생성은 모두 백그라운드에서 한다
+    # 같은 파일 상태의 집계가 이미 진행 중이면 모든 세션이 그 작업 하나를 기다린다
+    backend = dashboard_backend()
+    return run_in_background(('aggregates', backend, file_version(SOURCE_PATH)), load_aggregates_in_thread, backend)
+
+@timed('load_aggregates:background', cached=True)
+def load_aggregates_in_thread(backend=None):
+    # 백그라운드 작업 안에서 집계를 기다릴 때 사용 (Streamlit 화면 함수를 부르지 않고, 실패하면 예외)
+    backend = backend or dashboard_backend()
+    return _load_aggregates(_aggregates_version(backend), backend)
+
+@st.cache_data
+def _load_aggregates(version, backend='memory'):
+    # 데이터 버전별로 한 번만 집계하고, 차트는 작은 집계 테이블로만 그린다
+    cache_miss()
+
+    def build():
+        with measure(f'compute_aggregates:{backend}'):
+            if backend == 'memory':
+                return compute_aggregates(_load_data(version))
+            return compute_aggregates_out_of_core(SOURCE_PATH, backend)
+
+    # 공유 캐시를 쓰면 여러 프로세스 중 한 곳에서만 집계한다
+    shared = get_shared_cache()
+    # 큐브 구성 버전을 캐시 버전에 넣어, 컬럼 조합이 바뀌면 같은 데이터라도 다시 집계한다 (오래된 버전 파일은 공유 캐시가 정리)
+    aggs = shared.tables(f'aggregates-{backend}', f'{version}-c{CUBE_VERSION}', build) if shared is not None else build()
+    aggs['version'] = f'{backend}-{version}'
+    return aggs
+
+@st.cache_resource
+def get_live_aggregator():
+    # 모든 세션이 같은 실시간 집계기를 공유
+    return LiveAggregator()
+
+@st.cache_resource(max_entries=128)
+def _cached_figure_spec(chart_key, version, _build):
+    # 그림 객체 대신 직렬화한 사양(문자열)을 캐시한다 (세션끼리 바꿀 수 있는 객체를 공유하지 않는다)
+    cache_miss()
+    return _build().to_json()
+
+def cached_figure(aggs, chart_key, build):
+    # 같은 데이터 버전의 차트는 한 번만 만들고 직렬화해 모든 세션이 재사용 (세션마다 사양을 다시 읽은 읽기 전용 Figure)
+    with measure(f'figure:{chart_key}', cached=True):
+        return SpecFigure(_cached_figure_spec(chart_key, aggs.get('version'), build))
+
+def show_customer_types(aggs):
+    if "Cluster" in aggs:
         st.markdown("### 🏷️ 고객 유형별 고객유형 분류")
-        for k, v in customer_type_names.items():
+        for k, v in SEGMENTS['name'].items():
             st.markdown(f"- 고객 유형 {k+1} : {v}")
         st.markdown("---")
 
-def get_customer_type_name(idx):
-    return customer_type_names.get(idx, f"클러스터 {idx}")
-
-def analyze_gender_counts(data):
+@timed()
+def analyze_gender_counts(aggs):
     st.subheader("성별에 따른 구매 건수 분석")
-    gender_counts = data['Gender'].value_counts()
-    fig_gender = px.bar(x=gender_counts.index, y=gender_counts.values,
+    gender_counts = aggs['Gender']['count'].sort_values(ascending=False)
+    fig_gender = cached_figure(aggs, 'gender_chart', lambda: px.bar(x=gender_counts.index, y=gender_counts.values,
                          labels={'x': '성별', 'y': '구매 건수'},
-                         title='성별별 구매 건수')
+                         title='성별별 구매 건수'))
     st.plotly_chart(fig_gender, key='gender_chart')
     total_purchases = gender_counts.sum()
     male_percentage = (gender_counts.get('Male', 0) / total_purchases) * 100
     female_percentage = (gender_counts.get('Female', 0) / total_purchases) * 100
     st.markdown(f"- 남성 구매자는 전체 구매의 **{male_percentage:.1f}%** 를 차지하며, 여성 구매자는 **{female_percentage:.1f}%** 를 차지합니다. 📊")
 
-def analyze_payment_counts(data):
+@timed()
+def analyze_payment_counts(aggs):
     st.subheader("선호 결제 방식별 구매 건수 분석")
-    payment_counts = data['Preferred Payment Method'].value_counts()
-    fig_payment = px.bar(x=payment_counts.index, y=payment_counts.values,
+    payment_counts = aggs['Preferred Payment Method']['count'].sort_values(ascending=False)
+    fig_payment = cached_figure(aggs, 'payment_chart', lambda: px.bar(x=payment_counts.index, y=payment_counts.values,
                           labels={'x': '결제 방식', 'y': '구매 건수'},
-                          title='선호 결제 방식별 구매 건수')
+                          title='선호 결제 방식별 구매 건수'))
     st.plotly_chart(fig_payment, key='payment_chart')
 
-def analyze_age_counts(data):
+@timed()
+def analyze_age_counts(aggs):
     st.subheader("연령대별 구매 건수 분석")
-    data['Age Group'] = pd.cut(data['Age'], bins=[0, 20, 30, 40, 50, 60, 100], labels=['0-20', '21-30', '31-40', '41-50', '51-60', '60+'])
-    age_counts = data['Age Group'].value_counts()
-    fig_age = px.bar(x=age_counts.index, y=age_counts.values,
+    age_counts = aggs['Age Group']['count'].sort_values(ascending=False)
+    fig_age = cached_figure(aggs, 'age_chart', lambda: px.bar(x=age_counts.index, y=age_counts.values,
                          labels={'x': '연령대', 'y': '구매 건수'},
-                         title='연령대별 구매 건수')
+                         title='연령대별 구매 건수'))
     st.plotly_chart(fig_age, key='age_chart')
 
-def analyze_category_amounts(data):
+@timed()
+def analyze_category_amounts(aggs):
     st.subheader("카테고리별 총 구매 금액 분석")
-    category_amounts = data.groupby('Category')['Purchase Amount (USD)'].sum().sort_values(ascending=False)
-    fig_category = px.bar(x=category_amounts.index, y=category_amounts.values,
+    category_amounts = aggs['Category']['amount_sum'].sort_values(ascending=False)
+    fig_category = cached_figure(aggs, 'category_chart', lambda: px.bar(x=category_amounts.index, y=category_amounts.values,
                            labels={'x': '카테고리', 'y': '총 구매 금액 (USD)'},
-                           title='카테고리별 총 구매 금액')
+                           title='카테고리별 총 구매 금액'))
     st.plotly_chart(fig_category, key='category_chart')
 
-def analyze_location_amounts(data):
+@timed()
+def analyze_location_amounts(aggs):
     st.subheader("위치별 총 구매 금액 분석")
-    location_amounts = data.groupby('Location')['Purchase Amount (USD)'].sum().sort_values(ascending=False)
-    fig_location = px.bar(x=location_amounts.index, y=location_amounts.values,
+    # 50개 주는 모두 그대로 보여주고, 위치 종류가 MAX_LOCATIONS 개를 넘을 때만 상위 항목 + 기타로 합쳐 보낸다
+    location_amounts = top_n_with_other(aggs['Location']['amount_sum'], n=MAX_LOCATIONS)
+    title = '위치별 총 구매 금액'
+    if OTHER_LABEL in location_amounts.index:
+        title += f' (상위 {MAX_LOCATIONS}개 + 기타)'
+    fig_location = cached_figure(aggs, 'location_chart', lambda: px.bar(x=location_amounts.index, y=location_amounts.values,
                            labels={'x': '위치', 'y': '총 구매 금액 (USD)'},
-                           title='위치별 총 구매 금액')
+                           title=title))
     st.plotly_chart(fig_location, key='location_chart')
 
-def analyze_season_amounts(data):
+@timed()
+def analyze_season_amounts(aggs):
     st.subheader("시즌별 총 구매 금액 분석")
-    season_amounts = data.groupby('Season')['Purchase Amount (USD)'].sum().sort_values(ascending=False)
-    fig_season = px.bar(x=season_amounts.index, y=season_amounts.values,
+    season_amounts = aggs['Season']['amount_sum'].sort_values(ascending=False)
+    fig_season = cached_figure(aggs, 'season_chart', lambda: px.bar(x=season_amounts.index, y=season_amounts.values,
                            labels={'x': '시즌', 'y': '총 구매 금액 (USD)'},
-                           title='시즌별 총 구매 금액')
+                           title='시즌별 총 구매 금액'))
     st.plotly_chart(fig_season, key='season_chart')
 
-def analyze_item_amounts(data):
+@timed()
+def analyze_item_amounts(aggs):
     st.subheader("상품별 총 구매 금액 분석 (상위 10개)")
-    item_amounts = data.groupby('Item Purchased')['Purchase Amount (USD)'].sum().sort_values(ascending=False).head(10)
-    fig_item = px.bar(x=item_amounts.index, y=item_amounts.values,
+    item_amounts = aggs['Item Purchased']['amount_sum'].sort_values(ascending=False).head(10)
+    fig_item = cached_figure(aggs, 'item_chart', lambda: px.bar(x=item_amounts.index, y=item_amounts.values,
                            labels={'x': '상품', 'y': '총 구매 금액 (USD)'},
-                           title='상품별 총 구매 금액 (상위 10개)')
+                           title='상품별 총 구매 금액 (상위 10개)'))
     st.plotly_chart(fig_item, key='item_chart')
 
-def analyze_season_category(data):
+@timed()
+def analyze_season_category(aggs):
     st.subheader("계절별 카테고리 구매 패턴 분석")
-    filtered_data = data[data['Season'].isin(['Spring', 'Summer', 'Fall', 'Winter']) & data['Category'].isin(['Clothing', 'Accessories', 'Footwear', 'Outerwear'])]
-    season_category = pd.crosstab(filtered_data['Season'], filtered_data['Category'])
+    season_category = aggs[('Season', 'Category')]['count'].unstack(fill_value=0)
     season_order = ['Spring', 'Summer', 'Fall', 'Winter']
-    season_category = season_category.reindex(season_order)
-    fig_season_category = px.bar(season_category, x=season_category.index, y=season_category.columns, labels={'value': '구매 횟수', 'index': '계절', 'columns': '카테고리'})
-    fig_season_category.update_layout(barmode='stack', xaxis_title='계절', yaxis_title='구매 횟수')
+    categories = [c for c in season_category.columns if c in ['Clothing', 'Accessories', 'Footwear', 'Outerwear']]
+    season_category = season_category.reindex(index=season_order, columns=categories)
+    def build():
+        fig_season_category = px.bar(season_category, x=season_category.index, y=season_category.columns, labels={'value': '구매 횟수', 'index': '계절', 'columns': '카테고리'})
+        fig_season_category.update_layout(barmode='stack', xaxis_title='계절', yaxis_title='구매 횟수')
+        return fig_season_category
+    fig_season_category = cached_figure(aggs, 'season_category_chart', build)
     st.plotly_chart(fig_season_category, key='season_category_chart')
 
-def analyze_age_avg(data):
+@timed()
+def analyze_age_avg(aggs):
     st.subheader("연령대별 평균 구매 금액 분석")
-    data['Age Group'] = pd.cut(data['Age'], bins=[0, 20, 30, 40, 50, 60, 100], labels=['0-20', '21-30', '31-40', '41-50', '51-60', '60+'])
-    age_avg = data.groupby('Age Group')['Purchase Amount (USD)'].mean().sort_index()
-    fig_age = px.bar(x=age_avg.index, y=age_avg.values,
+    age_avg = mean_of(aggs['Age Group'], 'amount_sum').sort_index()
+    fig_age = cached_figure(aggs, 'age_avg_chart', lambda: px.bar(x=age_avg.index, y=age_avg.values,
                          labels={'x': '연령대', 'y': '평균 구매 금액 (USD)'},
-                         title='연령대별 평균 구매 금액')
+                         title='연령대별 평균 구매 금액'))
     st.plotly_chart(fig_age, key='age_avg_chart')
 
-def analyze_cluster_purchase(data):
+@timed()
+def analyze_cluster_purchase(aggs):
     st.subheader("고객유형별 평균 구매 금액 분석")
-    if "Cluster" in data.columns:
-        show_customer_types(data)
-        avg_purchase = data.groupby('Cluster')['Purchase Amount (USD)'].mean().sort_index()
-        x_labels = [f"{i} ({get_customer_type_name(i)})" for i in avg_purchase.index]
-        fig = px.bar(x=x_labels, y=avg_purchase.values,
+    if "Cluster" in aggs:
+        show_customer_types(aggs)
+        avg_purchase = mean_of(aggs['Cluster'], 'amount_sum').sort_index()
+        x_labels = [segment_label(i) for i in avg_purchase.index]
+        fig = cached_figure(aggs, 'cluster_purchase_chart', lambda: px.bar(x=x_labels, y=avg_purchase.values,
                      labels={'x': '고객유형', 'y': '평균 구매 금액 (USD)'},
-                     title='고객유형별 평균 구매 금액')
+                     title='고객유형별 평균 구매 금액'))
         st.plotly_chart(fig, key='cluster_purchase_chart')
 
-def analyze_cluster_rating(data):
+@timed()
+def analyze_cluster_rating(aggs):
     st.subheader("고객유형별 평균 리뷰 평점 분석")
-    if "Cluster" in data.columns:
-        avg_rating = data.groupby('Cluster')['Review Rating'].mean().sort_index()
-        x_labels = [f"{i} ({get_customer_type_name(i)})" for i in avg_rating.index]
-        fig = px.bar(x=x_labels, y=avg_rating.values,
+    if "Cluster" in aggs:
+        avg_rating = mean_of(aggs['Cluster'], 'rating_sum').sort_index()
+        x_labels = [segment_label(i) for i in avg_rating.index]
+        fig = cached_figure(aggs, 'cluster_rating_chart', lambda: px.bar(x=x_labels, y=avg_rating.values,
                      labels={'x': '클러스터(고객유형)', 'y': '평균 리뷰 평점'},
-                     title='클러스터(고객유형)별 평균 리뷰 평점')
+                     title='클러스터(고객유형)별 평균 리뷰 평점'))
         st.plotly_chart(fig, key='cluster_rating_chart')
 
-def analyze_cluster_sales(data):
+@timed()
+def analyze_cluster_sales(aggs):
     st.subheader("고객유형별 총 매출액")
-    if "Cluster" in data.columns:
-        sales = data.groupby('Cluster')['Purchase Amount (USD)'].sum().sort_index()
-        x_labels = [f"{i} ({get_customer_type_name(i)})" for i in sales.index]
-        fig = px.bar(x=x_labels, y=sales.values,
+    if "Cluster" in aggs:
+        sales = aggs['Cluster']['amount_sum'].sort_index()
+        x_labels = [segment_label(i) for i in sales.index]
+        fig = cached_figure(aggs, 'cluster_sales_chart', lambda: px.bar(x=x_labels, y=sales.values,
                      labels={'x': '클러스터(고객유형)', 'y': '총 구매 금액 (USD)'},
-                     title='클러스터(고객유형)별 총 매출액')
+                     title='클러스터(고객유형)별 총 매출액'))
         st.plotly_chart(fig, key='cluster_sales_chart')
 
-def analyze_cluster_age_distribution(data):
+@timed()
+def analyze_cluster_age_distribution(aggs):
     st.subheader("고객유형별 연령 분포")
-    if "Cluster" in data.columns:
-        age_groups = [0, 20, 30, 40, 50, 60, 100]
-        age_labels = ['0-20', '21-30', '31-40', '41-50', '51-60', '60+']
-        data['Age Group'] = pd.cut(data['Age'], bins=age_groups, labels=age_labels, right=False)
-        cluster_age = data.groupby(['Cluster', 'Age Group']).size().unstack(fill_value=0)
-        cluster_age.index = [f"{i} ({get_customer_type_name(i)})" for i in cluster_age.index]
-        fig = px.bar(cluster_age, x=cluster_age.index, y=cluster_age.columns,
-                     labels={'value': '고객 수', 'x': '클러스터(고객유형)', 'columns': '연령대'},
-                     title='클러스터(고객유형)별 연령 분포')
-        fig.update_layout(barmode='stack')
+    if ('Cluster', 'Age Group') in aggs:
+        cluster_age = aggs[('Cluster', 'Age Group')]['count'].unstack(fill_value=0)
+        cluster_age.index = [segment_label(i) for i in cluster_age.index]
+        def build():
+            fig = px.bar(cluster_age, x=cluster_age.index, y=cluster_age.columns,
+                         labels={'value': '고객 수', 'x': '클러스터(고객유형)', 'columns': '연령대'},
+                         title='클러스터(고객유형)별 연령 분포')
+            fig.update_layout(barmode='stack')
+            return fig
+        fig = cached_figure(aggs, 'cluster_age_chart', build)
         st.plotly_chart(fig, key='cluster_age_chart')
+
+@timed()
+def analyze_cluster_recommendations(aggs):
+    st.subheader("고객유형별 추천 전략")
+    # 군집별 인기 상품과 선호 계절은 집계 큐브의 (Cluster, Item Purchased) / (Cluster, Season) 교차 집계에서 구한다
+    profiles = segment_profiles(aggs)
+    table = profiles[['name', 'strategy', 'top_items', 'preferred_season']].rename(columns={
+        'name': '고객 유형', 'strategy': '마케팅 전략', 'top_items': '인기 상품', 'preferred_season': '선호 계절'})
+    table.index = [segment_label(i) for i in table.index]
+    st.dataframe(table)
+
+@timed()
+def analyze_live_clusters():
+    st.subheader("신규 예측 고객의 고객유형 현황 (실시간)")
+    live = get_live_aggregator()
+    with measure('live_aggregator.refresh'):
+        live.refresh()
+    aggs = live.snapshot()
+    if 'Cluster' not in aggs:
+        st.info("아직 예측된 신규 고객이 없습니다.")
+        return
+
+    cluster_stats = aggs['Cluster'].sort_index()
+    x_labels = [segment_label(i) for i in cluster_stats.index]
+    fig = px.bar(x=x_labels, y=cluster_stats['count'].values,
+                 labels={'x': '클러스터(고객유형)', 'y': '고객 수'},
+                 title='클러스터(고객유형)별 신규 예측 고객 수')
+    st.plotly_chart(fig, key='live_cluster_chart')
+
+    summary = pd.DataFrame({
+        '고객 수': cluster_stats['count'],
+        '평균 구매 금액 (USD)': mean_of(cluster_stats, 'amount_sum').round(1),
+        '평균 리뷰 평점': mean_of(cluster_stats, 'rating_sum').round(2),
+    })
+    summary.index = x_labels
+    st.dataframe(summary)
+
+    season_mix = aggs[('Cluster', 'Season')]['count'].unstack(fill_value=0)
+    season_mix.index = [segment_label(i) for i in season_mix.index]
+    fig = px.bar(season_mix, x=season_mix.index, y=season_mix.columns,
+                 labels={'value': '고객 수', 'x': '클러스터(고객유형)', 'columns': '계절'},
+                 title='클러스터(고객유형)별 신규 예측 고객의 계절 분포')
+    fig.update_layout(barmode='stack')
+    st.plotly_chart(fig, key='live_cluster_season_chart')
+    st.caption(f"예측 로그 {aggs['rows']:,}건 반영 (마지막 기록 번호 {aggs['last_id']:,})")
@@ -0,0 +1,184 @@
+import argparse
+import hashlib
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from ui.scoring import CATEGORICAL_FEATURES, FEATURE_COLUMNS, MODEL_PATH, NUMERIC_FEATURES, load_model
+
+SCORER_PATH = 'model/fast_scorer.npz'
+# 이 행 수 이하는 dict 조회가 pandas 인덱스 조회보다 빠르다
+SMALL_BATCH_ROWS = 64
+
+def _file_sha256(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def export_pipeline(pipeline):
+    # StandardScaler + OneHotEncoder + LogisticRegression 을 NumPy 가중치로 펼친다
+    #   점수 = intercept + (x - mean) / scale @ W_num.T + sum(W_cat[카테고리])
+    # 정규화는 가중치와 절편에 미리 반영하고, 원-핫 인코딩은 카테고리별 가중치 조회로 바꾼다
+    preprocessor = pipeline.named_steps['preprocessor']
+    classifier = pipeline.named_steps['classifier']
+    transformers = {name: (transformer, columns) for name, transformer, columns in preprocessor.transformers_}
+    scaler, numeric_columns = transformers['num']
+    encoder, categorical_columns = transformers['cat']
+    if list(numeric_columns) != NUMERIC_FEATURES or list(categorical_columns) != CATEGORICAL_FEATURES:
+        raise ValueError("파이프라인의 입력 컬럼이 예상과 다릅니다.")
+
+    coef = classifier.coef_.astype(np.float64)
+    intercept = classifier.intercept_.astype(np.float64)
+    if coef.shape[0] == 1:
+        # 이진 분류는 (음성, 양성) 두 점수로 바꿔 다중 분류와 같은 방식으로 계산
+        coef = np.vstack([-coef, coef]) / 2
+        intercept = np.array([-intercept[0], intercept[0]]) / 2
+
+    n_numeric = len(NUMERIC_FEATURES)
+    numeric_coef = coef[:, :n_numeric] / scaler.scale_
+    arrays = {
+        'classes': classifier.classes_,
+        'numeric_weights': numeric_coef,
+        'intercept': intercept - numeric_coef @ scaler.mean_,
+    }
+
+    offset = n_numeric
+    for i, categories in enumerate(encoder.categories_):
+        weights = coef[:, offset:offset + len(categories)].T
+        # 마지막 행은 학습 때 보지 못한 카테고리(코드 -1)용 0 가중치 (handle_unknown='ignore' 와 동일)
+        arrays[f'cat_{i}_values'] = np.asarray(categories).astype(str)
+        arrays[f'cat_{i}_weights'] = np.vstack([weights, np.zeros(coef.shape[0])])
+        offset += len(categories)
+    return arrays
+
+class FastScorer:
+    # 내보낸 가중치로 sklearn 파이프라인과 같은 클러스터를 예측하는 NumPy 점수 계산기
+
+    def __init__(self, arrays):
+        self.classes = arrays['classes']
+        self.numeric_weights = arrays['numeric_weights']
+        self.intercept = arrays['intercept']
+        self.categories = [pd.Index(arrays[f'cat_{i}_values']) for i in range(len(CATEGORICAL_FEATURES))]
+        self.category_codes = [{value: code for code, value in enumerate(categories)} for categories in self.categories]
+        self.category_weights = [arrays[f'cat_{i}_weights'] for i in range(len(CATEGORICAL_FEATURES))]
+        self.source_sha256 = str(arrays['source_sha256']) if 'source_sha256' in arrays else None
+
+    @classmethod
+    def from_pipeline(cls, pipeline):
+        return cls(export_pipeline(pipeline))
+
+    @classmethod
+    def load(cls, path=SCORER_PATH):
+        with np.load(path) as arrays:
+            return cls({key: arrays[key] for key in arrays.files})
+
+    def _codes(self, i, values):
+        # 없는 카테고리는 -1 이 되어 마지막(0 가중치) 행을 가리킨다
+        if len(values) <= SMALL_BATCH_ROWS:
+            lookup = self.category_codes[i]
+            return np.array([lookup.get(str(v), -1) for v in values.tolist()], dtype=np.intp)
+        # 행마다 문자열로 바꾸지 않고 열(Series)을 한 번 factorize 한 뒤 고유값만 카테고리 코드로 바꾼다
+        # (Arrow 문자열/범주형 열은 NumPy 객체 배열로 꺼내지 않아야 빠르다)
+        codes, uniques = pd.factorize(values)
+        mapped = np.append(self.categories[i].get_indexer(pd.Index(uniques).astype(str)), -1)
+        return mapped[codes]
+
+    def decision_function(self, data):
+        # 열 단위로 꺼내 DataFrame 열 선택(복사) 비용을 피한다
+        numeric = np.column_stack([data[col].to_numpy(dtype=np.float64) for col in NUMERIC_FEATURES])
+        scores = numeric @ self.numeric_weights.T + self.intercept
+        for i, col in enumerate(CATEGORICAL_FEATURES):
+            scores += self.category_weights[i][self._codes(i, data[col])]
+        return scores
+
+    def predict(self, data):
+        return self.classes[np.argmax(self.decision_function(data), axis=1)]
+
+def export_scorer(model_path=MODEL_PATH, output=SCORER_PATH):
+    arrays = export_pipeline(load_model(model_path))
+    arrays['source_sha256'] = np.array(_file_sha256(model_path))
+    tmp_path = f'{output}.{os.getpid()}.tmp.npz'
+    np.savez(tmp_path, **arrays)
+    os.replace(tmp_path, output)
+    return FastScorer(arrays)
+
+def load_scorer_for(model_path=MODEL_PATH, scorer_path=SCORER_PATH):
+    # 내보낸 가중치가 현재 모델 파일에서 만들어진 경우에만 사용 (아니면 None)
+    if not os.path.exists(scorer_path) or not os.path.exists(model_path):
+        return None
+    scorer = FastScorer.load(scorer_path)
+    if scorer.source_sha256 != _file_sha256(model_path):
+        return None
+    return scorer
+
+def random_profiles(rows, pipeline, seed=0):
+    # 입력 범위 전체에서 무작위 고객 프로필 생성 (일치 검증용)
+    rng = np.random.default_rng(seed)
+    encoder = pipeline.named_steps['preprocessor'].named_transformers_['cat']
+    data = {
+        'Age': rng.integers(18, 71, rows),
+        'Purchase Amount (USD)': rng.integers(20, 101, rows),
+        'Review Rating': np.round(rng.uniform(2.5, 5.0, rows), 1),
+        'Previous Purchases': rng.integers(0, 51, rows),
+    }
+    for col, categories in zip(CATEGORICAL_FEATURES, encoder.categories_):
+        data[col] = rng.choice(np.asarray(categories), rows)
+    return pd.DataFrame(data)[FEATURE_COLUMNS]
+
+def verify(pipeline, scorer, data):
+    # sklearn 파이프라인과 예측이 다른 행 수
+    return int((np.asarray(pipeline.predict(data)) != scorer.predict(data)).sum())
+
+def check(pipeline, scorer, verify_rows=100_000, seed=0):
+    # 원본 데이터 + 무작위 프로필로 sklearn 과의 일치 여부와 일괄/단일 예측 속도를 비교
+    data = pd.concat([pd.read_csv('data/shopping_trends.csv', usecols=FEATURE_COLUMNS),
+                      random_profiles(verify_rows, pipeline, seed)], ignore_index=True)
+    mismatches = verify(pipeline, scorer, data)
+
+    start = time.perf_counter()
+    pipeline.predict(data)
+    sklearn_time = time.perf_counter() - start
+    start = time.perf_counter()
+    scorer.predict(data)
+    fast_time = time.perf_counter() - start
+    print(f"일치 검증: {len(data):,}행 중 불일치 {mismatches}행")
+    print(f"일괄 예측: sklearn {sklearn_time * 1000:.1f}ms / fast {fast_time * 1000:.1f}ms")
+
+    single = data.iloc[:1]
+    start = time.perf_counter()
+    for _ in range(200):
+        pipeline.predict(single)
+    sklearn_time = (time.perf_counter() - start) / 200
+    start = time.perf_counter()
+    for _ in range(200):
+        scorer.predict(single)
+    fast_time = (time.perf_counter() - start) / 200
+    print(f"단일 예측: sklearn {sklearn_time * 1000:.3f}ms / fast {fast_time * 1000:.3f}ms")
+    return mismatches
+
+def main():
+    parser = argparse.ArgumentParser(description="LogisticRegression 파이프라인을 NumPy 점수 계산기로 내보내기")
+    parser.add_argument('--model', default=MODEL_PATH)
+    parser.add_argument('--output', default=SCORER_PATH)
+    parser.add_argument('--verify-rows', type=int, default=100_000, help="일치 검증에 사용할 무작위 프로필 수 (0: 검증 안 함)")
+    parser.add_argument('--check', action='store_true',
+                        help="내보내지 않고 이미 내보낸 점수 계산기만 검증 (없거나 모델과 다르면/불일치가 있으면 종료 코드 1)")
+    args = parser.parse_args()
+
+    if args.check:
+        scorer = load_scorer_for(args.model, args.output)
+        if scorer is None:
+            print(f"{args.output} 이 없거나 {args.model} 에서 만들어지지 않았습니다.")
+            raise SystemExit(1)
+    else:
+        scorer = export_scorer(args.model, args.output)
+        print(f"{args.model} -> {args.output}")
+        if not args.verify_rows:
+            return
+
+    if check(load_model(args.model), scorer, args.verify_rows):
+        raise SystemExit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+
+# 파생 컬럼 구간 정의 (앱 전체에서 이 정의 하나만 사용)
+AGE_BINS = [0, 20, 30, 40, 50, 60, 100]
+AGE_LABELS = ['0-20', '21-30', '31-40', '41-50', '51-60', '60+']
+
+SPEND_BINS = [0, 40, 70, np.inf]
+SPEND_LABELS = ['Low', 'Medium', 'High']
+
+LOYALTY_BINS = [-np.inf, 10, 25, 40, np.inf]
+LOYALTY_LABELS = ['New', 'Regular', 'Loyal', 'Champion']
+
+DERIVED_COLUMNS = ['Age Group', 'Spend Bucket', 'Loyalty Tier']
+
+def _bucket(values, bins, labels):
+    # 구간 라벨은 모두 (a, b] 로 통일하고 순서가 있는 category 로 만든다
+    return pd.cut(pd.to_numeric(values, errors='coerce'), bins=bins, labels=labels, right=True, ordered=True)
+
+def add_derived_features(data):
+    # 원본 프레임은 그대로 두고 파생 컬럼을 붙인 새 프레임을 돌려준다
+    derived = {}
+    if 'Age' in data.columns:
+        derived['Age Group'] = _bucket(data['Age'], AGE_BINS, AGE_LABELS)
+    if 'Purchase Amount (USD)' in data.columns:
+        derived['Spend Bucket'] = _bucket(data['Purchase Amount (USD)'], SPEND_BINS, SPEND_LABELS)
+    if 'Previous Purchases' in data.columns:
+        derived['Loyalty Tier'] = _bucket(data['Previous Purchases'], LOYALTY_BINS, LOYALTY_LABELS)
+    return data.assign(**derived)
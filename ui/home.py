@@ -11,6 +11,8 @@ def home_page():
     - **앱 소개**: 시스템의 상세한 설명과 사용 방법을 확인합니다.
     - **고객 유형 예측**: 새로운 고객 정보를 입력하고 예측 결과를 확인합니다.
     - **데이터 분석**: 데이터를 분석하고 인사이트를 얻습니다.
+    - **고객 검색**: 고객 ID 나 카테고리, 계절, 고객 유형 등의 조건으로 고객을 찾습니다.
+    - **고객 유형 변화**: 신규 예측 고객의 고객 유형 구성이 기존 고객과 얼마나 달라졌는지 확인합니다.
     
     궁금한 점이 있으시면 언제든 고객센터로 문의해 주세요.
     """)
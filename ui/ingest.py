@@ -0,0 +1,294 @@
+import argparse
+import csv
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+from ui.data_store import CATEGORICAL_COLUMNS
+from ui.scoring import FEATURE_COLUMNS, MODEL_PATH
+
+SOURCE_PATH = 'data/shopping_trends.csv'
+OUTPUT_PATH = 'data/customers.parquet'
+REJECTS_PATH = 'data/ingest_rejects.csv'
+# 워커 하나가 한 번에 읽는 원본 크기 (메모리 사용량 = 워커 수 x 블록 크기 정도)
+DEFAULT_BLOCK_SIZE = 64 << 20
+
+# 적재한 고객 테이블의 컬럼별 타입 (문자열 컬럼은 ui/data_store.py 와 같이 사전(category) 인코딩)
+INTEGER_TYPES = {
+    'Customer ID': 'int64',
+    'Age': 'int16',
+    'Purchase Amount (USD)': 'int32',
+    'Previous Purchases': 'int32',
+}
+FLOAT_TYPES = {'Review Rating': 'float32'}
+# 범위를 벗어나면 잘못된 행으로 본다 (최소, 최대)
+VALUE_RANGES = {
+    'Customer ID': (1, None),
+    'Age': (0, 120),
+    'Purchase Amount (USD)': (0, None),
+    'Previous Purchases': (0, None),
+    'Review Rating': (0.0, 5.0),
+}
+# 비어 있으면 예측할 수 없는 문자열 컬럼
+REQUIRED_TEXT_COLUMNS = [col for col in FEATURE_COLUMNS if col not in INTEGER_TYPES and col not in FLOAT_TYPES]
+REJECT_COLUMNS = ['block', 'reason', 'raw']
+
+def read_header(source):
+    with open(source, 'rb') as f:
+        header = f.readline()
+    return header, next(csv.reader([header.decode('utf-8-sig')]))
+
+def split_blocks(source, block_size=DEFAULT_BLOCK_SIZE):
+    # 헤더 뒤를 block_size 단위로 나누되, 경계는 항상 줄의 시작에 맞춘다
+    # (따옴표 안의 줄바꿈은 지원하지 않는다)
+    header, _ = read_header(source)
+    size = os.path.getsize(source)
+    blocks = []
+    start = len(header)
+    with open(source, 'rb') as f:
+        while start < size:
+            end = min(start + block_size, size)
+            if end < size:
+                f.seek(end)
+                end += len(f.readline())
+            blocks.append((start, end))
+            start = end
+    return blocks
+
+def validate(data):
+    # 문자열로 읽은 블록의 타입 변환과 범위 검사를 한 번에 하고 (정상 행, 잘못된 행별 사유) 를 돌려준다
+    reasons = pd.Series('', index=data.index)
+    typed = {}
+
+    def mark(mask, reason):
+        reasons[mask & (reasons == '')] = reason
+
+    for col, dtype in {**INTEGER_TYPES, **FLOAT_TYPES}.items():
+        values = pd.to_numeric(data[col].str.strip(), errors='coerce')
+        mark(values.isna(), f'{col}: 숫자가 아님')
+        if dtype.startswith('int'):
+            mark(values.notna() & (values != values.round()), f'{col}: 정수가 아님')
+        low, high = VALUE_RANGES[col]
+        if low is not None:
+            mark(values < low, f'{col}: {low} 미만')
+        if high is not None:
+            mark(values > high, f'{col}: {high} 초과')
+        typed[col] = values
+
+    for col in REQUIRED_TEXT_COLUMNS:
+        mark(data[col].isna() | (data[col].str.strip() == ''), f'{col}: 비어 있음')
+
+    valid = (reasons == '').to_numpy()
+    clean = data[valid].copy()
+    for col, dtype in {**INTEGER_TYPES, **FLOAT_TYPES}.items():
+        clean[col] = typed[col][valid].astype(dtype)
+    return clean, reasons[~valid]
+
+def _line_spans(raw):
+    # 블록 안의 비어 있지 않은 줄마다 (시작, 끝) 위치. 끝은 줄바꿈(\r\n)을 뺀 위치
+    # pyarrow 는 빈 줄을 건너뛰고 행 번호도 빈 줄을 빼고 세므로 같은 기준으로 맞춘다
+    buf = np.frombuffer(raw, dtype=np.uint8)
+    ends = np.flatnonzero(buf == ord('\n'))
+    if len(buf) and buf[-1] != ord('\n'):
+        ends = np.append(ends, len(buf))
+    starts = np.concatenate([[0], ends[:-1] + 1]).astype(np.int64)
+    has_cr = (ends > starts) & (buf[np.maximum(ends - 1, 0)] == ord('\r'))
+    ends = ends - has_cr
+    nonempty = ends > starts
+    return starts[nonempty], ends[nonempty]
+
+def _quoted_lines(data):
+    # 원문 위치를 맞출 수 없을 때(따옴표 안 줄바꿈 등)만 사용: 파싱한 값을 CSV 규칙대로 다시 쓴다
+    buffer = io.StringIO()
+    data.to_csv(buffer, header=False, index=False, quoting=csv.QUOTE_MINIMAL, lineterminator='\n')
+    return buffer.getvalue().splitlines()
+
+def read_lines(source, offsets):
+    # 파일 내 위치의 원문 줄을 읽는다 (중복 행 보고용)
+    lines = []
+    with open(source, 'rb') as f:
+        for offset in offsets:
+            f.seek(int(offset))
+            lines.append(f.readline().rstrip(b'\r\n').decode('utf-8'))
+    return lines
+
+_scorer = None
+
+def _init_worker(score, model_path):
+    # 워커마다 모델을 한 번만 불러온다 (내보낸 NumPy 점수 계산기가 있으면 그것을 사용)
+    global _scorer
+    if score:
+        from ui.fast_scorer import load_scorer_for
+        from ui.scoring import load_model
+        _scorer = load_scorer_for(model_path) or load_model(model_path)
+
+def _ingest_block(source, index, start, end, column_names, work_dir):
+    invalid_rows = []
+
+    def on_invalid_row(row):
+        # 컬럼 수가 맞지 않는 줄은 건너뛰고 원문과 (빈 줄을 뺀) 행 번호를 보관
+        invalid_rows.append((row.number, row.text))
+        return 'skip'
+
+    with open(source, 'rb') as f:
+        f.seek(start)
+        raw = f.read(end - start)
+    table = pa_csv.read_csv(
+        pa.py_buffer(raw),
+        read_options=pa_csv.ReadOptions(column_names=column_names, use_threads=False),
+        parse_options=pa_csv.ParseOptions(invalid_row_handler=on_invalid_row),
+        convert_options=pa_csv.ConvertOptions(column_types={col: pa.string() for col in column_names},
+                                              strings_can_be_null=True),
+    )
+    data = table.to_pandas()
+    # customer_data.csv 처럼 맨 앞에 이름 없는 인덱스 컬럼이 있으면 버린다
+    data = data.drop(columns=[col for col in data.columns if col == '' or col.startswith('Unnamed')])
+    rows_read = len(data) + len(invalid_rows)
+
+    # 파싱된 행마다 원본 줄 위치를 기억해 잘못된 행/중복 행을 원문 그대로 보고한다
+    starts, ends = _line_spans(raw)
+    skipped = [number - 1 for number, _ in invalid_rows if number is not None and number > 0]
+    aligned = len(skipped) == len(invalid_rows) and len(starts) == rows_read
+    if aligned:
+        keep = np.ones(len(starts), dtype=bool)
+        keep[skipped] = False
+        starts, ends = starts[keep], ends[keep]
+
+    def raw_lines(positions):
+        if aligned:
+            return [raw[starts[i]:ends[i]].decode('utf-8') for i in positions]
+        return _quoted_lines(table.to_pandas().iloc[positions])
+
+    clean, reasons = validate(data)
+    if _scorer is not None:
+        clean['Cluster'] = np.asarray(_scorer.predict(clean[FEATURE_COLUMNS])).astype('int8')
+    elif 'Cluster' in clean.columns:
+        clean['Cluster'] = pd.to_numeric(clean['Cluster'], errors='coerce').astype('Int8')
+
+    rejects = [(index, '컬럼 수가 맞지 않음', text) for _, text in invalid_rows]
+    if len(reasons):
+        rejects += [(index, reason, text) for reason, text in zip(reasons, raw_lines(reasons.index.to_numpy()))]
+
+    part_path = os.path.join(work_dir, f'part_{index:06d}.parquet')
+    pq.write_table(_encode_categories(clean), part_path)
+    valid = data.index.get_indexer(clean.index)
+    return {
+        'index': index,
+        'part_path': part_path,
+        'rows_read': rows_read,
+        'customer_ids': clean['Customer ID'].to_numpy(),
+        # 저장한 행의 원본 줄 위치 (원문 위치를 맞출 수 없는 블록은 None)
+        'line_offsets': starts[valid] + start if aligned else None,
+        'rejects': rejects,
+    }
+
+def _encode_categories(data):
+    # 반복되는 문자열 컬럼은 사전 인코딩 (블록마다 인덱스 타입이 달라지지 않도록 Arrow 에서 int32 로 인코딩)
+    table = pa.Table.from_pandas(data, preserve_index=False)
+    for col in CATEGORICAL_COLUMNS:
+        if col in table.column_names:
+            table = table.set_column(table.column_names.index(col), col, table[col].dictionary_encode())
+    return table
+
+def _ingest_block_args(args):
+    return _ingest_block(*args)
+
+def ingest(source=SOURCE_PATH, output=OUTPUT_PATH, rejects_path=REJECTS_PATH, workers=None,
+           block_size=DEFAULT_BLOCK_SIZE, score=True, model_path=MODEL_PATH):
+    start_time = time.perf_counter()
+    _, column_names = read_header(source)
+    missing = [col for col in ['Customer ID'] + FEATURE_COLUMNS if col not in column_names]
+    if missing:
+        raise ValueError(f"필수 컬럼이 없습니다: {', '.join(missing)}")
+    blocks = split_blocks(source, block_size)
+    workers = workers or os.cpu_count() or 1
+    work_dir = tempfile.mkdtemp(prefix='ingest_', dir=os.path.dirname(os.path.abspath(output)))
+    summary = {'source': source, 'blocks': len(blocks), 'workers': workers}
+
+    try:
+        # 1) 블록별 파싱/검증/예측을 여러 프로세스에서 동시에 처리하고 블록별 Parquet 로 저장
+        tasks = [(source, i, s, e, column_names, work_dir) for i, (s, e) in enumerate(blocks)]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(score, model_path)) as pool:
+            results = sorted(pool.map(_ingest_block_args, tasks), key=lambda r: r['index'])
+
+        # 2) Customer ID 중복은 파일에서 마지막에 나온 행만 남긴다
+        all_ids = np.concatenate([r['customer_ids'] for r in results]) if results else np.array([], dtype=np.int64)
+        keep = ~pd.Series(all_ids).duplicated(keep='last').to_numpy()
+
+        # 3) 블록 순서대로 하나의 Parquet 파일로 합친다 (블록 하나씩만 메모리에 올림)
+        rejects = [reject for r in results for reject in r['rejects']]
+        written = 0
+        offset = 0
+        writer = None
+        tmp_output = f'{output}.{os.getpid()}.tmp'
+        for r in results:
+            part = pq.read_table(r['part_path'])
+            block_keep = keep[offset:offset + part.num_rows]
+            offset += part.num_rows
+            if not block_keep.all():
+                if r['line_offsets'] is not None:
+                    texts = read_lines(source, r['line_offsets'][~block_keep])
+                else:
+                    texts = _quoted_lines(part.filter(pa.array(~block_keep)).to_pandas())
+                rejects += [(r['index'], 'Customer ID 중복 (뒤의 행 유지)', text) for text in texts]
+                part = part.filter(pa.array(block_keep))
+            if writer is None:
+                writer = pq.ParquetWriter(tmp_output, part.schema)
+            writer.write_table(part)
+            written += part.num_rows
+        if writer is not None:
+            writer.close()
+            os.replace(tmp_output, output)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    pd.DataFrame(rejects, columns=REJECT_COLUMNS).to_csv(rejects_path, index=False, encoding='utf-8-sig')
+
+    elapsed = time.perf_counter() - start_time
+    rows_read = sum(r['rows_read'] for r in results)
+    summary.update({
+        'output': output,
+        'rejects_path': rejects_path,
+        'rows_read': rows_read,
+        'rows_written': written,
+        'rejected': len(rejects),
+        'reject_reasons': dict(Counter(reason for _, reason, _ in rejects)),
+        'scored': bool(score),
+        'seconds': round(elapsed, 3),
+        'rows_per_second': round(rows_read / elapsed) if elapsed else None,
+    })
+    with open(os.path.splitext(output)[0] + '.ingest.json', 'w', encoding='utf-8') as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description="원본 CSV 를 검증해 고객 테이블(Parquet)로 적재")
+    parser.add_argument('--source', default=SOURCE_PATH)
+    parser.add_argument('--output', default=OUTPUT_PATH)
+    parser.add_argument('--rejects', default=REJECTS_PATH, help="잘못된 행과 사유를 저장할 CSV")
+    parser.add_argument('--workers', type=int, default=None, help="프로세스 수 (기본: 모든 코어)")
+    parser.add_argument('--block-size-mb', type=int, default=DEFAULT_BLOCK_SIZE >> 20, help="워커가 한 번에 읽는 크기")
+    parser.add_argument('--no-score', action='store_true', help="Cluster 예측 생략 (원본에 Cluster 가 있으면 그대로 사용)")
+    args = parser.parse_args()
+
+    summary = ingest(args.source, args.output, args.rejects, args.workers, args.block_size_mb << 20, not args.no_score)
+    print(f"{summary['source']} -> {summary['output']}")
+    print(f"  읽은 행 {summary['rows_read']:,} / 저장 {summary['rows_written']:,} / 제외 {summary['rejected']:,}")
+    for reason, count in summary['reject_reasons'].items():
+        print(f"    {reason}: {count:,}")
+    print(f"  {summary['seconds']:.2f}초 ({summary['rows_per_second']:,} 행/초, 블록 {summary['blocks']}개, 워커 {summary['workers']}개)")
+
+if __name__ == '__main__':
+    main()
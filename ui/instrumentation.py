@@ -0,0 +1,102 @@
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# 이 환경 변수에 파일 경로를 주면 측정 기록을 JSON lines 로 계속 덧붙인다
+EXPORT_PATH_ENV = 'CRM_TIMINGS_PATH'
+# 화면에 보여줄 최근 호출 기록 수
+MAX_EVENTS = 5_000
+
+_events = deque(maxlen=MAX_EVENTS)
+_summary = {}
+_lock = threading.Lock()
+_local = threading.local()
+
+def _stack():
+    if not hasattr(_local, 'stack'):
+        _local.stack = []
+    return _local.stack
+
+def _record(event):
+    with _lock:
+        _events.append(event)
+        entry = _summary.setdefault(event['name'], {'calls': 0, 'total_s': 0.0, 'max_s': 0.0, 'cache_hits': 0, 'cache_misses': 0})
+        entry['calls'] += 1
+        entry['total_s'] += event['seconds']
+        entry['max_s'] = max(entry['max_s'], event['seconds'])
+        if event['cache_hit'] is True:
+            entry['cache_hits'] += 1
+        elif event['cache_hit'] is False:
+            entry['cache_misses'] += 1
+    path = os.environ.get(EXPORT_PATH_ENV)
+    if path:
+        with _lock, open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(event, ensure_ascii=False) + '\n')
+
+@contextmanager
+def measure(name, cached=False):
+    # 블록의 소요 시간을 기록. cached=True 이면 블록 안에서 cache_miss() 가 불리지 않은 호출을 캐시 적중으로 센다
+    # 캐시 적중 여부를 직접 아는 경우에는 돌려받은 dict 의 'cache_hit' 을 설정하면 된다
+    event = {'name': name, 'started_at': time.time(), 'seconds': 0.0, 'cache_hit': True if cached else None}
+    stack = _stack()
+    stack.append(event)
+    start = time.perf_counter()
+    try:
+        yield event
+    finally:
+        event['seconds'] = round(time.perf_counter() - start, 6)
+        stack.pop()
+        _record(event)
+
+def cache_miss():
+    # st.cache_* 함수 본문(캐시 미적중일 때만 실행됨)에서 호출해 가장 가까운 cached 측정을 미적중으로 표시
+    for event in reversed(_stack()):
+        if event['cache_hit'] is not None:
+            event['cache_hit'] = False
+            return
+
+def timed(name=None, cached=False):
+    # 함수 호출마다 소요 시간을 기록하는 데코레이터
+    def decorator(func):
+        label = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with measure(label, cached):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def summary():
+    # 표로 바로 보여줄 수 있도록 행 목록으로 돌려준다 (startup_report 와 같은 형식)
+    with _lock:
+        rows = [
+            {
+                '항목': name,
+                '호출 수': entry['calls'],
+                '합계 (초)': round(entry['total_s'], 3),
+                '평균 (초)': round(entry['total_s'] / entry['calls'], 4),
+                '최대 (초)': round(entry['max_s'], 4),
+                '캐시 적중': entry['cache_hits'],
+                '캐시 미적중': entry['cache_misses'],
+            }
+            for name, entry in _summary.items()
+        ]
+    return sorted(rows, key=lambda row: row['합계 (초)'], reverse=True)
+
+def recent_events(limit=None):
+    with _lock:
+        events = list(_events)
+    return events[-limit:] if limit else events
+
+def to_jsonl():
+    return ''.join(json.dumps(event, ensure_ascii=False) + '\n' for event in recent_events())
+
+def reset():
+    with _lock:
+        _events.clear()
+        _summary.clear()
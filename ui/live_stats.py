@@ -0,0 +1,44 @@
+import threading
+
+from ui.aggregates import group_stats, merge_stats
+from ui.prediction_log import get_prediction_log
+
+# 예측 로그에서 실시간으로 집계할 차원
+LIVE_DIMENSIONS = ['Cluster', 'Category', 'Season']
+LIVE_PAIRS = [('Cluster', 'Category'), ('Cluster', 'Season')]
+
+class LiveAggregator:
+    # 예측 로그를 tail 하면서 새로 들어온 행만 건수/합계 테이블에 더해 나간다
+
+    def __init__(self, log=None, chunk_size=100_000):
+        self.log = log or get_prediction_log()
+        self.chunk_size = chunk_size
+        self.last_id = 0
+        self.rows = 0
+        self.tables = {}
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        # 마지막으로 읽은 id 이후의 행만 읽으므로 전체 기록을 다시 스캔하지 않는다
+        with self._lock:
+            added = 0
+            for rows, last_id in self.log.iter_since(self.last_id, self.chunk_size):
+                self._fold(rows)
+                self.last_id = last_id
+                added += len(rows)
+            self.rows += added
+            return added
+
+    def _fold(self, rows):
+        rows = rows.dropna(subset=['Cluster'])
+        for dim in LIVE_DIMENSIONS:
+            self.tables[dim] = merge_stats(self.tables.get(dim), group_stats(rows, dim))
+        for pair in LIVE_PAIRS:
+            self.tables[pair] = merge_stats(self.tables.get(pair), group_stats(rows, list(pair)))
+
+    def snapshot(self):
+        with self._lock:
+            aggs = {key: table.copy() for key, table in self.tables.items()}
+            aggs['rows'] = self.rows
+            aggs['last_id'] = self.last_id
+            return aggs
@@ -1,18 +1,51 @@
+import io
+
 import streamlit as st
 import pandas as pd
-import joblib
 
-# 저장된 모델 불러오기
-model = joblib.load('model/pipeline.pkl')
+from ui.background import poll_task, run_in_background
+from ui.data_store import SOURCE_PATH, file_version
+from ui.instrumentation import measure
+from ui.model_server import ModelClient
+from ui.out_of_core import dashboard_backend
+from ui.prediction_log import get_prediction_log
+from ui.scoring import PredictionCache, predict_in_chunks, read_feature_file
+from ui.segments import SEGMENTS, UNKNOWN_SEGMENT, recommend, segment_profiles
+
+@st.cache_resource
+def get_model():
+    # CRM_MODEL_SERVER_URL 이 설정되어 있으면 추론 서버로 보내고, 아니면 처음 예측할 때 로컬 모델을 불러온다
+    return ModelClient.from_env()
+
+@st.cache_resource
+def get_prediction_cache():
+    # 같은 고객 프로필을 다시 예측할 때는 모델을 거치지 않는다 (모든 세션 공유)
+    return PredictionCache()
+
+@st.cache_resource(max_entries=2)
+def _segment_profiles(backend, version):
+    # 고객 유형 표에 집계 큐브의 군집별 인기 상품/선호 계절을 붙인다 (원본 파일 상태별로 한 번만 계산, 모든 세션 공유)
+    from ui.eda import load_aggregates_in_thread
+
+    return segment_profiles(load_aggregates_in_thread(backend))
+
+def load_segment_profiles():
+    # 백그라운드 작업 안에서 실행 (일괄 예측): 내려받을 파일의 컬럼이 비지 않도록 집계가 준비될 때까지 기다린다
+    # 집계에 실패하면 고객 유형 표만 사용하고 오류 메시지를 함께 돌려준다
+    try:
+        return _segment_profiles(dashboard_backend(), file_version(SOURCE_PATH)), None
+    except Exception as e:
+        return segment_profiles(), str(e)
+
+def load_segment_profiles_async():
+    # 단일 예측용: 기다리지 않고 작업만 시작한다 (같은 파일 상태면 모든 세션이 한 작업과 한 결과를 공유)
+    backend = dashboard_backend()
+    version = file_version(SOURCE_PATH)
+    return run_in_background(('segment_profiles', backend, version), _segment_profiles, backend, version)
 
-cluster_descriptions = {
-    0: "고액 소비 VIP 고객",
-    1: "젊은 신규 고객",
-    2: "중간 소비 젊은 고객",
-    3: "중년층 충성 고객",
-    4: "보수적인 중장년층 고객",
-    5: "가격에 민감한 중년층 고객"
-}
+def _show_profile_error(error):
+    if error:
+        st.warning(f"인기 상품/선호 계절 정보를 불러오지 못했습니다: {error}")
 
 def predict_new_customer():
     st.title("고객 유형 예측")
@@ -23,6 +56,11 @@ def predict_new_customer():
 
     st.markdown("## 머신러닝 과정 ⚙️")
     st.markdown("이 모델은 K-means 클러스터링과 Logistic Regression을 사용하여 고객 유형을 예측합니다. 자세한 내용은 **앱 소개** 탭을 참고해주세요.")
+
+    mode = st.radio("예측 방식", ["단일 고객", "일괄 예측 (CSV / Parquet)"], horizontal=True)
+    if mode != "단일 고객":
+        predict_batch_customers()
+        return
     
     age = st.number_input("나이", min_value=18, max_value=70)
     purchase_amount = st.number_input("구매 금액 (USD)", min_value=20, max_value=100)
@@ -47,27 +85,156 @@ def predict_new_customer():
             'Season': [season],
             'Frequency of Purchases': [frequency]
         })
-        
-        prediction = model.predict(input_data)
-        cluster = prediction[0]
-        description = cluster_descriptions.get(cluster, "알 수 없는 그룹")
-        
-        st.write(f"특징 : {description}")
-        
-        # 추가적인 그룹별 특성 설명
-        if cluster == 0:
-            st.success("이 고객은 고액을 자주 소비하는 VIP 고객입니다.\n\n마케팅 전략 : 프리미엄 제품 추천, 개인화된 VIP 서비스 제공")
-        elif cluster == 1:
-            st.success("이 고객은 젊은 층으로, 다양한 제품을 시도하는 경향이 있습니다.\n\n마케팅 전략 : 트렌디한 제품 추천, 소셜 미디어 마케팅 강화")
-        elif cluster == 2:
-            st.success("이 고객은 젊은 층이지만 중간 정도의 구매력을 가지고 있습니다.\n\n마케팅 전략 : 가성비 좋은 중급 제품 추천, 로열티 프로그램 참여 유도")
-        elif cluster == 3:
-            st.success("이 고객은 중년층으로, 브랜드에 대한 높은 충성도를 보입니다.\n\n마케팅 전략 : 장기 고객 혜택 강화, 신제품 우선 체험 기회 제공")
-        elif cluster == 4:
-            st.success("이 고객은 중장년층으로, 익숙한 제품을 선호하고 변화를 꺼립니다.\n\n마케팅 전략 : 신뢰성 강조, 기존 제품의 개선점 홍보")
-        elif cluster == 5:
-            st.success("이 고객은 중년층이지만 가격에 민감하며 할인을 선호합니다.\n\n마케팅 전략 : 할인 행사 정보 우선 제공, 가격 대비 품질 강조")
-
-        # 새로운 고객 데이터를 CSV 파일에 저장 (메시지 출력 없음)
-        input_data['Cluster'] = cluster
-        input_data.to_csv('data/customer_data3.csv', mode='a', header=False, index=False)
+        # 예측은 백그라운드 스레드에서 실행하고, 끝날 때까지 자리 표시만 보여준다
+        st.session_state['single_prediction'] = run_in_background(
+            None, _predict_single, get_model(), get_prediction_cache(), input_data)
+        st.session_state.pop('single_result', None)
+
+    task = st.session_state.get('single_prediction')
+    if task is not None:
+        try:
+            ready, result = poll_task(task, "고객 유형을 예측하는 중입니다...")
+        except Exception as e:
+            st.session_state.pop('single_prediction', None)
+            st.error(f"예측 중 오류 발생: {e}")
+            return
+        if not ready:
+            return
+        st.session_state.pop('single_prediction', None)
+        cluster, st.session_state['prediction_log_task'] = result
+        # 고객 유형 설명은 바로 보여주고, 인기 상품/선호 계절은 집계가 끝나는 대로 채운다
+        try:
+            profiles_task = load_segment_profiles_async()
+        except Exception as e:
+            profiles_task = None
+            _show_profile_error(e)
+        st.session_state['single_result'] = (cluster, profiles_task)
+
+    result = st.session_state.get('single_result')
+    if result is not None:
+        _show_single_result(*result)
+    log_task = st.session_state.get('prediction_log_task')
+    if log_task is not None:
+        _check_prediction_log(log_task)
+
+def _check_prediction_log(task):
+    # 예측 로그 기록은 결과 표시와 따로 실행하되, 실패하면 (다음 실행에서라도) 화면에 알린다
+    try:
+        ready, _ = poll_task(task, "예측 결과를 기록하는 중입니다...")
+    except Exception as e:
+        ready = True
+        st.warning(f"예측 결과를 로그에 저장하지 못했습니다: {e}")
+    if ready:
+        st.session_state.pop('prediction_log_task', None)
+
+def _show_single_result(cluster, profiles_task):
+    # 군집별 설명과 마케팅 전략은 ui/segments.py 의 고객 유형 표에서 가져온다
+    if cluster not in SEGMENTS.index:
+        st.session_state.pop('single_result', None)
+        st.write(f"특징 : {UNKNOWN_SEGMENT}")
+        return
+    profile = SEGMENTS.loc[cluster]
+    st.write(f"특징 : {profile['name']}")
+    box = st.empty()
+    message = f"{profile['description']}\n\n마케팅 전략 : {profile['strategy']}"
+
+    ready, profiles = True, None
+    if profiles_task is not None:
+        try:
+            ready, profiles = poll_task(profiles_task, "추천 상품과 선호 계절을 불러오는 중입니다...")
+        except Exception as e:
+            _show_profile_error(e)
+    if profiles is not None:
+        if pd.notna(profiles.at[cluster, 'top_items']):
+            message += f"\n\n추천 상품 : {profiles.at[cluster, 'top_items']}"
+        if pd.notna(profiles.at[cluster, 'preferred_season']):
+            message += f"\n\n선호 계절 : {profiles.at[cluster, 'preferred_season']}"
+    box.success(message)
+    # 결과는 버튼을 누른 뒤 추천 정보까지 채워질 때까지만 보여준다 (그 다음 실행에서는 사라진다)
+    if ready:
+        st.session_state.pop('single_result', None)
+
+    cache_stats = get_prediction_cache().stats()
+    st.caption(f"예측 캐시 적중 {cache_stats['hits']:,}회 / 미적중 {cache_stats['misses']:,}회 (적중률 {cache_stats['hit_rate']:.0%})")
+
+def _predict_single(model, cache, input_data):
+    # 백그라운드 스레드에서 실행 (Streamlit 함수는 부르지 않는다)
+    with measure('predict:single') as timing:
+        prediction, hits = cache.predict_with_hits(model, input_data)
+        timing['cache_hit'] = hits > 0
+    cluster = prediction[0]
+
+    # 새로운 고객 데이터를 예측 로그에 저장 (결과 표시를 기다리게 하지 않도록 따로 실행하고, Future 는 페이지가 확인)
+    log_task = run_in_background(None, _log_prediction, input_data.assign(Cluster=cluster))
+    return cluster, log_task
+
+def _log_prediction(input_data):
+    with measure('prediction_log.append'):
+        get_prediction_log().append(input_data)
+
+def predict_batch_customers():
+    st.markdown("## 일괄 예측 📂")
+    st.markdown("단일 예측과 같은 8개 컬럼(Age, Purchase Amount (USD), Review Rating, Previous Purchases, Category, Color, Season, Frequency of Purchases)을 포함한 파일을 업로드하세요.")
+
+    uploaded = st.file_uploader("고객 파일 업로드", type=['csv', 'parquet'])
+    if uploaded is None:
+        return
+
+    try:
+        with measure('read_feature_file'):
+            data = read_feature_file(uploaded)
+    except Exception as e:
+        st.error(f"파일을 읽는 중 오류 발생: {e}")
+        return
+
+    st.write(f"업로드된 고객 수: {len(data):,}명")
+
+    # 같은 파일이 업로드되어 있는 동안은 예측 결과를 세션에 유지한다
+    file_key = (uploaded.name, uploaded.size)
+    if st.button("일괄 예측"):
+        st.session_state['batch_prediction'] = (file_key, run_in_background(
+            None, _predict_batch, get_model(), data, with_progress=True))
+
+    entry = st.session_state.get('batch_prediction')
+    if entry is None or entry[0] != file_key:
+        return
+    try:
+        ready, result = poll_task(entry[1], "예측 중...")
+    except Exception as e:
+        st.session_state.pop('batch_prediction', None)
+        st.error(f"예측 중 오류 발생: {e}")
+        return
+    if not ready:
+        return
+
+    # 고객 유형, 마케팅 전략, 인기 상품, 선호 계절을 모든 행에 한 번에 붙여 캠페인 대상 파일로 내려받는다
+    clusters, profiles, profile_error = result
+    _show_profile_error(profile_error)
+    result = pd.concat([data.assign(Cluster=clusters), recommend(clusters, profiles)], axis=1)
+    st.progress(1.0, text="예측 완료")
+
+    skipped = int(clusters.isna().sum())
+    if skipped:
+        st.warning(f"수치형 값이 올바르지 않은 {skipped:,}개 행은 예측하지 못했습니다.")
+
+    st.dataframe(result.head(100))
+    counts = result['Customer Type'].value_counts()
+    st.write(counts[counts > 0])
+
+    base_name = uploaded.name.rsplit('.', 1)[0]
+    if uploaded.name.lower().endswith('.parquet'):
+        buffer = io.BytesIO()
+        result.to_parquet(buffer, index=False)
+        st.download_button("결과 다운로드 (Parquet)", buffer.getvalue(),
+                           file_name=f"{base_name}_predicted.parquet",
+                           mime='application/octet-stream')
+    else:
+        st.download_button("결과 다운로드 (CSV)", result.to_csv(index=False).encode('utf-8-sig'),
+                           file_name=f"{base_name}_predicted.csv", mime='text/csv')
+
+def _predict_batch(model, data, on_progress):
+    # 백그라운드 스레드에서 실행하고, 진행률은 자리 표시 조각이 주기적으로 읽어 간다
+    with measure('predict:batch'):
+        clusters = predict_in_chunks(model, data, on_progress=on_progress)
+    # 내려받을 파일의 인기 상품/선호 계절 컬럼이 비지 않도록 일괄 예측만 집계가 준비될 때까지 이 작업 안에서 기다린다
+    return (clusters, *load_segment_profiles())
@@ -0,0 +1,193 @@
+import argparse
+import io
+import json
+import os
+import queue
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+from ui.fast_scorer import load_scorer_for
+from ui.scoring import FEATURE_COLUMNS, MODEL_PATH, NUMERIC_FEATURES, load_model, model_signature, prepare_features
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+# 이 환경 변수가 있으면 앱은 로컬 모델 대신 추론 서버를 사용
+SERVER_URL_ENV = 'CRM_MODEL_SERVER_URL'
+
+def check_features(features):
+    # 요청을 묶기 전에 요청마다 검사한다 (잘못된 요청 하나가 같은 배치의 다른 요청을 실패시키지 않도록)
+    missing = [col for col in FEATURE_COLUMNS if col not in features.columns]
+    if missing:
+        raise ValueError(f"필수 컬럼이 없습니다: {', '.join(missing)}")
+    features = prepare_features(features)
+    invalid = np.flatnonzero(features[NUMERIC_FEATURES].isna().any(axis=1).to_numpy())
+    if len(invalid):
+        raise ValueError(f"수치형 값이 올바르지 않은 행이 있습니다: {invalid[:10].tolist()}")
+    return features
+
+class MicroBatcher:
+    # 여러 세션에서 동시에 들어온 예측 요청을 모아 한 번의 predict 로 처리
+
+    def __init__(self, model, max_batch_rows=20_000, max_wait=0.005):
+        self.model = model
+        self.max_batch_rows = max_batch_rows
+        self.max_wait = max_wait
+        self.batches = 0
+        self.requests = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, features, timeout=30.0):
+        features = check_features(features)
+        done = threading.Event()
+        item = {'features': features, 'done': done, 'result': None, 'error': None}
+        self._queue.put(item)
+        if not done.wait(timeout):
+            raise TimeoutError("예측 요청 시간이 초과되었습니다.")
+        if item['error'] is not None:
+            raise item['error']
+        return item['result']
+
+    def _collect(self):
+        # 첫 요청이 올 때까지 기다린 뒤 max_wait 동안 들어온 요청을 묶는다
+        items = [self._queue.get()]
+        rows = len(items[0]['features'])
+        deadline = time.monotonic() + self.max_wait
+        while rows < self.max_batch_rows:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            items.append(item)
+            rows += len(item['features'])
+        return items
+
+    def _predict(self, features):
+        return np.asarray(self.model.predict(features[FEATURE_COLUMNS]))
+
+    def _run(self):
+        while True:
+            items = self._collect()
+            try:
+                batch = pd.concat([item['features'] for item in items], ignore_index=True)
+                predictions = self._predict(batch)
+                offset = 0
+                for item in items:
+                    size = len(item['features'])
+                    item['result'] = predictions[offset:offset + size]
+                    offset += size
+            except Exception:
+                # 묶어서 실패하면 요청마다 다시 예측해 오류는 원인이 된 요청에만 돌려준다
+                for item in items:
+                    try:
+                        item['result'] = self._predict(item['features'])
+                    except Exception as e:
+                        item['error'] = e
+            self.batches += 1
+            self.requests += len(items)
+            for item in items:
+                item['done'].set()
+
+def _make_handler(batcher):
+    class PredictionHandler(BaseHTTPRequestHandler):
+        def _send_json(self, status, payload):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path != '/health':
+                self._send_json(404, {'error': 'not found'})
+                return
+            self._send_json(200, {'status': 'ok', 'batches': batcher.batches, 'requests': batcher.requests})
+
+        def do_POST(self):
+            if self.path != '/predict':
+                self._send_json(404, {'error': 'not found'})
+                return
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                features = pd.read_json(io.StringIO(self.rfile.read(length).decode('utf-8')), orient='split')
+                clusters = batcher.submit(features)
+            except Exception as e:
+                self._send_json(400, {'error': str(e)})
+                return
+            self._send_json(200, {'clusters': [int(c) for c in clusters]})
+
+        def log_message(self, format, *args):
+            # 요청마다 로그를 남기지 않는다
+            pass
+
+    return PredictionHandler
+
+def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, model_path=MODEL_PATH, max_wait=0.005):
+    batcher = MicroBatcher(load_scorer_for(model_path) or load_model(model_path), max_wait=max_wait)
+    server = ThreadingHTTPServer((host, port), _make_handler(batcher))
+    print(f"모델 서버 실행 중: http://{host}:{port} (model: {model_path})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+class ModelClient:
+    # 추론 서버를 우선 사용하고, 서버가 없거나 응답이 없으면 로컬 모델로 예측
+
+    def __init__(self, url=None, timeout=5.0, model_path=MODEL_PATH):
+        self.url = url.rstrip('/') if url else None
+        self.timeout = timeout
+        self.model_path = model_path
+        self._local_model = None
+        self._local_signature = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        return cls(os.environ.get(SERVER_URL_ENV))
+
+    def local_model(self):
+        # 로컬 모델은 처음 필요할 때만 불러오고, 모델 파일이 교체되면 다시 불러온다
+        # 현재 모델에서 내보낸 NumPy 점수 계산기(ui.fast_scorer)가 있으면 그것을 사용
+        with self._lock:
+            signature = model_signature(self.model_path)
+            if self._local_model is None or signature != self._local_signature:
+                self._local_model = load_scorer_for(self.model_path) or load_model(self.model_path)
+                self._local_signature = signature
+            return self._local_model
+
+    def _predict_remote(self, data):
+        body = data[FEATURE_COLUMNS].to_json(orient='split', index=False).encode('utf-8')
+        request = urllib.request.Request(f'{self.url}/predict', data=body,
+                                         headers={'Content-Type': 'application/json'})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return np.asarray(json.loads(response.read())['clusters'])
+
+    def predict(self, data):
+        if self.url:
+            try:
+                return self._predict_remote(data)
+            except (OSError, ValueError, KeyError):
+                pass
+        return self.local_model().predict(data)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="고객 유형 예측 모델 서버")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--model', default=MODEL_PATH)
+    parser.add_argument('--max-wait-ms', type=float, default=5.0, help="요청을 묶기 위해 기다리는 최대 시간")
+    args = parser.parse_args()
+    serve(args.host, args.port, args.model, args.max_wait_ms / 1000)
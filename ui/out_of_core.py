@@ -0,0 +1,121 @@
+import os
+
+import pandas as pd
+
+from ui.aggregates import AMOUNT, DIMENSIONS, PAIRS, RATING, group_stats, merge_stats
+from ui.features import (AGE_BINS, AGE_LABELS, LOYALTY_BINS, LOYALTY_LABELS, SPEND_BINS, SPEND_LABELS,
+                         add_derived_features)
+
+# 집계에 필요한 원본 컬럼만 읽는다
+SOURCE_COLUMNS = ['Gender', 'Preferred Payment Method', 'Age', 'Category', 'Location', 'Season',
+                  'Item Purchased', 'Cluster', AMOUNT, RATING, 'Previous Purchases']
+
+# 대시보드 집계 방식: memory(전체 로드), chunked(청크 스트리밍), duckdb(SQL 푸시다운)
+BACKEND_ENV = 'CRM_DASHBOARD_BACKEND'
+BACKENDS = ['memory', 'chunked', 'duckdb']
+
+def dashboard_backend():
+    backend = os.environ.get(BACKEND_ENV, 'memory').lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"알 수 없는 집계 방식입니다: {backend} (가능한 값: {', '.join(BACKENDS)})")
+    return backend
+
+def _is_parquet(source):
+    return os.path.splitext(source)[1].lower() in ('.parquet', '.pq')
+
+def iter_source_chunks(source, chunksize=500_000):
+    # CSV / Parquet 파일을 필요한 컬럼만 chunksize 행씩 읽는다 (메모리 사용량은 청크 크기로 제한)
+    if _is_parquet(source):
+        import pyarrow.parquet as pq
+
+        parquet = pq.ParquetFile(source)
+        columns = [col for col in SOURCE_COLUMNS if col in parquet.schema_arrow.names]
+        for batch in parquet.iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(source, usecols=lambda col: col in SOURCE_COLUMNS, chunksize=chunksize)
+
+def compute_aggregates_chunked(source, chunksize=500_000):
+    # 청크마다 건수/합계를 구해 더하므로 전체 데이터를 메모리에 올리지 않는다
+    aggs = {'rows': 0}
+    for chunk in iter_source_chunks(source, chunksize):
+        chunk[AMOUNT] = pd.to_numeric(chunk[AMOUNT], errors='coerce')
+        chunk[RATING] = pd.to_numeric(chunk[RATING], errors='coerce')
+        chunk = add_derived_features(chunk)
+        aggs['rows'] += len(chunk)
+        for dim in DIMENSIONS:
+            if dim in chunk.columns:
+                aggs[dim] = merge_stats(aggs.get(dim), group_stats(chunk, dim))
+        for pair in PAIRS:
+            if all(col in chunk.columns for col in pair):
+                aggs[pair] = merge_stats(aggs.get(pair), group_stats(chunk, list(pair)))
+    return _restore_order(aggs)
+
+def _sql_bucket(column, bins, labels):
+    # features.py 와 같은 (a, b] 구간을 SQL CASE 식으로 만든다
+    cases = []
+    for low, high, label in zip(bins[:-1], bins[1:], labels):
+        conditions = []
+        if low != float('-inf'):
+            conditions.append(f'"{column}" > {low}')
+        if high != float('inf'):
+            conditions.append(f'"{column}" <= {high}')
+        cases.append(f"WHEN {' AND '.join(conditions)} THEN '{label}'")
+    return f"CASE {' '.join(cases)} END"
+
+def compute_aggregates_duckdb(source):
+    # group-by 를 DuckDB 에 맡겨 파일을 스트리밍으로 집계 (duckdb 패키지가 필요)
+    import duckdb
+
+    reader = 'read_parquet' if _is_parquet(source) else 'read_csv_auto'
+    scan = f"{reader}('{source.replace(chr(39), chr(39) * 2)}')"
+    con = duckdb.connect()
+    try:
+        available = [row[0] for row in con.execute(f"DESCRIBE SELECT * FROM {scan}").fetchall()]
+        derived = {
+            'Age Group': _sql_bucket('Age', AGE_BINS, AGE_LABELS),
+            'Spend Bucket': _sql_bucket(AMOUNT, SPEND_BINS, SPEND_LABELS),
+            'Loyalty Tier': _sql_bucket('Previous Purchases', LOYALTY_BINS, LOYALTY_LABELS),
+        }
+        select = [f'"{col}"' for col in SOURCE_COLUMNS if col in available]
+        select += [f'{expr} AS "{name}"' for name, expr in derived.items()]
+        con.execute(f"CREATE TEMP VIEW customers AS SELECT {', '.join(select)} FROM {scan}")
+
+        columns = set(available) | set(derived)
+        aggs = {'rows': con.execute("SELECT COUNT(*) FROM customers").fetchone()[0]}
+        for key in DIMENSIONS + PAIRS:
+            keys = list(key) if isinstance(key, tuple) else [key]
+            if not all(col in columns for col in keys):
+                continue
+            quoted = ', '.join(f'"{col}"' for col in keys)
+            not_null = ' AND '.join(f'"{col}" IS NOT NULL' for col in keys)
+            table = con.execute(
+                f'SELECT {quoted}, COUNT(*) AS count, SUM("{AMOUNT}")::DOUBLE AS amount_sum, SUM("{RATING}")::DOUBLE AS rating_sum '
+                f'FROM customers WHERE {not_null} GROUP BY {quoted}'
+            ).df()
+            aggs[key] = table.set_index(keys if len(keys) > 1 else keys[0]).sort_index()
+    finally:
+        con.close()
+    return _restore_order(aggs)
+
+def _restore_order(aggs):
+    # 파생 구간은 메모리 방식과 같은 순서의 category 인덱스로 맞춘다
+    orders = {'Age Group': AGE_LABELS, 'Spend Bucket': SPEND_LABELS, 'Loyalty Tier': LOYALTY_LABELS}
+    for key, table in aggs.items():
+        if not isinstance(table, pd.DataFrame):
+            continue
+        index = table.index.to_frame(index=False)
+        changed = False
+        for name, labels in orders.items():
+            if name in index.columns:
+                index[name] = pd.Categorical(index[name].astype(str), categories=labels, ordered=True)
+                changed = True
+        if changed:
+            table.index = pd.MultiIndex.from_frame(index) if index.shape[1] > 1 else pd.Index(index.iloc[:, 0], name=index.columns[0])
+            aggs[key] = table.sort_index()
+    return aggs
+
+def compute_aggregates_out_of_core(source, backend='chunked', chunksize=500_000):
+    if backend == 'duckdb':
+        return compute_aggregates_duckdb(source)
+    return compute_aggregates_chunked(source, chunksize)
@@ -0,0 +1,186 @@
+import atexit
+import csv
+import os
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+
+from ui.scoring import FEATURE_COLUMNS, NUMERIC_FEATURES
+
+LOG_PATH = 'data/prediction_log.db'
+# 이전 버전에서 예측 결과를 누적하던 CSV (최초 1회 로그로 옮겨 온다)
+LEGACY_CSV_PATH = 'data/customer_data3.csv'
+
+LOG_COLUMNS = FEATURE_COLUMNS + ['Cluster']
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+_COLUMN_SQL = ', '.join(_quote(col) for col in LOG_COLUMNS)
+_INSERT_SQL = f"INSERT INTO predictions (logged_at, {_COLUMN_SQL}) VALUES (?, {', '.join('?' for _ in LOG_COLUMNS)})"
+
+class PredictionLog:
+    # 예측 결과를 메모리에 모았다가 SQLite(WAL)에 한 트랜잭션으로 기록하는 추가 전용 로그
+    # SQLite 잠금이 프로세스 간 쓰기를 직렬화하므로 여러 Streamlit 세션이 동시에 써도 행이 섞이지 않는다
+
+    def __init__(self, path=LOG_PATH, flush_size=32, flush_interval=2.0, legacy_csv=LEGACY_CSV_PATH):
+        self.path = path
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._timer = None
+        self._init_db(legacy_csv)
+        atexit.register(self.flush)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def _init_db(self, legacy_csv):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        columns = ', '.join(
+            f"{_quote(col)} {'REAL' if col in NUMERIC_FEATURES else 'INTEGER' if col == 'Cluster' else 'TEXT'}"
+            for col in LOG_COLUMNS
+        )
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.execute(f"CREATE TABLE IF NOT EXISTS predictions (id INTEGER PRIMARY KEY AUTOINCREMENT, logged_at REAL NOT NULL, {columns})")
+            conn.execute("CREATE TABLE IF NOT EXISTS log_meta (key TEXT PRIMARY KEY, value TEXT)")
+            imported = conn.execute("SELECT value FROM log_meta WHERE key = 'legacy_imported'").fetchone()
+            if imported is None:
+                if legacy_csv and os.path.exists(legacy_csv):
+                    conn.executemany(_INSERT_SQL, _read_legacy_rows(legacy_csv))
+                conn.execute("INSERT INTO log_meta (key, value) VALUES ('legacy_imported', ?)", (str(time.time()),))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+    def append(self, rows):
+        # rows: LOG_COLUMNS 를 포함한 DataFrame
+        now = time.time()
+        records = [(now, *_normalize_record(record)) for record in rows[LOG_COLUMNS].itertuples(index=False, name=None)]
+        with self._lock:
+            self._buffer.extend(records)
+            should_flush = len(self._buffer) >= self.flush_size
+            if not should_flush and self._timer is None:
+                # 버퍼가 덜 찼어도 flush_interval 이 지나면 기록
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if should_flush:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            records, self._buffer = self._buffer, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not records:
+                return 0
+
+            conn = self._connect()
+            try:
+                conn.execute('BEGIN IMMEDIATE')
+                conn.executemany(_INSERT_SQL, records)
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                # 기록에 실패한 행은 다음 flush 때 다시 시도
+                self._buffer = records + self._buffer
+                raise
+            finally:
+                conn.close()
+        return len(records)
+
+    def read_since(self, last_id=0, limit=None):
+        # last_id 이후에 기록된 행만 읽는다. (새 행 DataFrame, 마지막 id) 를 돌려준다
+        self.flush()
+        query = f"SELECT id, logged_at, {_COLUMN_SQL} FROM predictions WHERE id > ? ORDER BY id"
+        params = [last_id]
+        if limit is not None:
+            query += ' LIMIT ?'
+            params.append(limit)
+
+        conn = self._connect()
+        try:
+            rows = pd.read_sql_query(query, conn, params=params, index_col='id')
+        finally:
+            conn.close()
+
+        next_id = int(rows.index[-1]) if len(rows) else last_id
+        return rows, next_id
+
+    def iter_since(self, last_id=0, chunk_size=100_000):
+        # 큰 로그를 청크 단위로 순회
+        while True:
+            rows, last_id = self.read_since(last_id, limit=chunk_size)
+            if rows.empty:
+                return
+            yield rows, last_id
+
+    def read_all(self):
+        rows, _ = self.read_since(0)
+        return rows
+
+    def last_id(self):
+        self.flush()
+        conn = self._connect()
+        try:
+            return conn.execute("SELECT COALESCE(MAX(id), 0) FROM predictions").fetchone()[0]
+        finally:
+            conn.close()
+
+_shared_log = None
+_shared_lock = threading.Lock()
+
+def get_prediction_log():
+    # 프로세스당 하나의 로그 인스턴스를 공유해 쓰기를 모아서 기록
+    global _shared_log
+    with _shared_lock:
+        if _shared_log is None:
+            _shared_log = PredictionLog()
+        return _shared_log
+
+def _normalize_record(record):
+    # numpy 스칼라는 sqlite 가 바로 받지 못하므로 파이썬 기본형으로 변환
+    values = []
+    for col, value in zip(LOG_COLUMNS, record):
+        if pd.isna(value):
+            values.append(None)
+        elif col in NUMERIC_FEATURES:
+            values.append(float(value))
+        elif col == 'Cluster':
+            values.append(int(value))
+        else:
+            values.append(str(value))
+    return values
+
+def _read_legacy_rows(path):
+    # 기존 CSV 는 인덱스 컬럼이 있는 행(10개)과 없는 행(9개)이 섞여 있다
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        for row in reader:
+            if len(row) == len(LOG_COLUMNS) + 1:
+                row = row[1:]
+            if len(row) != len(LOG_COLUMNS):
+                continue
+            try:
+                values = [float(v) for v in row[:len(NUMERIC_FEATURES)]]
+                cluster = int(row[-1])
+            except ValueError:
+                continue
+            yield (0.0, *values, *row[len(NUMERIC_FEATURES):-1], cluster)
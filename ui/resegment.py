@@ -0,0 +1,210 @@
+import argparse
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from ui.prediction_log import get_prediction_log
+from ui.scoring import FEATURE_COLUMNS, prepare_features
+from ui.segmentation import build_preprocessor
+
+STATE_PATH = 'model/segmentation_state.joblib'
+BASE_DATA_PATH = 'data/customer_data.csv'
+
+def _dense(X):
+    X = X.toarray() if sparse.issparse(X) else np.asarray(X)
+    return X.astype(np.float32, copy=False)
+
+def _distances(X, centroids, chunk_size=100_000):
+    # (n, k) 유클리드 거리 행렬을 청크 단위로 계산
+    out = np.empty((X.shape[0], centroids.shape[0]), dtype=np.float32)
+    c_sq = (centroids ** 2).sum(axis=1)
+    for start in range(0, X.shape[0], chunk_size):
+        block = X[start:start + chunk_size]
+        sq = (block ** 2).sum(axis=1)[:, None] - 2 * block @ centroids.T + c_sq[None, :]
+        out[start:start + chunk_size] = np.sqrt(np.maximum(sq, 0))
+    return out
+
+def _assign(X, centroids):
+    # 가장 가까운 중심, 그 거리(상한), 두 번째로 가까운 거리(하한)
+    dist = _distances(X, centroids)
+    order = np.argsort(dist, axis=1)[:, :2]
+    rows = np.arange(len(dist))
+    return order[:, 0], dist[rows, order[:, 0]], dist[rows, order[:, 1]]
+
+class Resegmenter:
+    # 기존 클러스터 중심에서 시작해 새 고객이 들어올 때마다 중심을 온라인(mini-batch) K-means 로 갱신
+    # 중심 이동량으로 거리 상/하한을 갱신(Hamerly 방식)해, 번호가 바뀔 수 있는 고객만 다시 계산한다
+
+    def __init__(self, preprocessor, centroids, counts, customer_ids, X, labels, upper, lower, last_log_id=0):
+        self.preprocessor = preprocessor
+        self.centroids = centroids
+        self.counts = counts
+        self.customer_ids = customer_ids
+        self.X = X
+        self.labels = labels
+        self.upper = upper
+        self.lower = lower
+        self.last_log_id = last_log_id
+        self._sort_by_customer()
+
+    def _sort_by_customer(self):
+        # 고객 ID 로 정렬해 두고 searchsorted 로 찾는다 (같은 ID 가 여러 번 있으면 마지막 행만 유지)
+        ids = self.customer_ids
+        if len(ids) and np.all(ids[1:] > ids[:-1]):
+            return
+        order = np.argsort(ids, kind='stable')
+        sorted_ids = ids[order]
+        last = np.append(sorted_ids[1:] != sorted_ids[:-1], True)
+        order = order[last]
+        self.customer_ids = ids[order]
+        self.X = self.X[order]
+        self.labels = self.labels[order]
+        self.upper = self.upper[order]
+        self.lower = self.lower[order]
+
+    @classmethod
+    def from_customers(cls, data):
+        # 현재 클러스터 번호별 평균을 초기 중심으로 사용하므로 번호(고객 유형 이름)가 그대로 유지된다
+        features = prepare_features(data)
+        preprocessor = build_preprocessor()
+        X = _dense(preprocessor.fit_transform(features))
+        clusters = data['Cluster'].to_numpy().astype(np.int64)
+        k = int(clusters.max()) + 1
+        counts = np.bincount(clusters, minlength=k).astype(np.float64)
+        sums = np.zeros((k, X.shape[1]), dtype=np.float64)
+        np.add.at(sums, clusters, X)
+        centroids = (sums / np.maximum(counts, 1)[:, None]).astype(np.float32)
+
+        labels, upper, lower = _assign(X, centroids)
+        return cls(preprocessor, centroids, counts, data['Customer ID'].to_numpy().astype(np.int64),
+                   X, labels, upper, lower)
+
+    @classmethod
+    def load(cls, path=STATE_PATH):
+        return cls(**joblib.load(path))
+
+    def save(self, path=STATE_PATH):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        joblib.dump(self.__dict__, tmp_path)
+        os.replace(tmp_path, path)
+
+    def _update_centroids(self, X_new):
+        # 중심별 누적 개수를 학습률로 쓰는 mini-batch K-means 갱신
+        nearest, _, _ = _assign(X_new, self.centroids)
+        k = len(self.centroids)
+        batch_counts = np.bincount(nearest, minlength=k).astype(np.float64)
+        batch_sums = np.zeros_like(self.centroids, dtype=np.float64)
+        np.add.at(batch_sums, nearest, X_new)
+
+        old = self.centroids.copy()
+        seen = batch_counts > 0
+        self.counts[seen] += batch_counts[seen]
+        rate = (batch_counts[seen] / self.counts[seen])[:, None]
+        self.centroids[seen] = (old[seen] + rate * (batch_sums[seen] / batch_counts[seen][:, None] - old[seen])).astype(np.float32)
+        return np.linalg.norm(self.centroids - old, axis=1)
+
+    def update(self, rows, customer_ids):
+        # 이미 있는 고객은 특성과 번호를 바꾸고, 처음 보는 고객만 추가한다
+        customer_ids = np.asarray(customer_ids, dtype=np.int64)
+        X_new = _dense(self.preprocessor.transform(prepare_features(rows)))
+        # 같은 배치 안에서 ID 가 반복되면 마지막 행만 사용
+        _, last = np.unique(customer_ids[::-1], return_index=True)
+        keep = np.sort(len(customer_ids) - 1 - last)
+        customer_ids, X_new = customer_ids[keep], X_new[keep]
+        shifts = self._update_centroids(X_new)
+
+        # 중심이 움직인 만큼 상한은 늘리고 하한은 줄인다. 상한 > 하한 인 고객만 번호가 바뀔 수 있다
+        self.upper += shifts[self.labels]
+        self.lower -= shifts.max()
+        affected = np.flatnonzero(self.upper > self.lower)
+        relabeled = 0
+        if len(affected):
+            labels, upper, lower = _assign(self.X[affected], self.centroids)
+            relabeled = int((labels != self.labels[affected]).sum())
+            self.labels[affected] = labels
+            self.upper[affected] = upper
+            self.lower[affected] = lower
+
+        new_labels, new_upper, new_lower = _assign(X_new, self.centroids)
+        positions = np.searchsorted(self.customer_ids, customer_ids)
+        existing = positions < len(self.customer_ids)
+        existing[existing] = self.customer_ids[positions[existing]] == customer_ids[existing]
+
+        at = positions[existing]
+        self.X[at] = X_new[existing]
+        self.labels[at] = new_labels[existing]
+        self.upper[at] = new_upper[existing]
+        self.lower[at] = new_lower[existing]
+
+        # 새 고객은 ID 순서로 정렬해 끼워 넣어야 같은 위치에 여러 명이 들어가도 정렬이 유지된다
+        added = np.flatnonzero(~existing)
+        added = added[np.argsort(customer_ids[added], kind='stable')]
+        at = positions[added]
+        self.customer_ids = np.insert(self.customer_ids, at, customer_ids[added])
+        self.X = np.insert(self.X, at, X_new[added], axis=0)
+        self.labels = np.insert(self.labels, at, new_labels[added])
+        self.upper = np.insert(self.upper, at, new_upper[added])
+        self.lower = np.insert(self.lower, at, new_lower[added])
+        return {
+            'new_customers': len(added),
+            'updated_customers': int(existing.sum()),
+            'checked': int(len(affected)),
+            'relabeled': relabeled,
+            'max_shift': float(shifts.max()),
+        }
+
+    def update_from_log(self, log=None, chunk_size=100_000):
+        # 예측 로그에서 아직 반영하지 않은 행만 읽어 갱신 (로그 행의 고객 ID 는 -로그번호)
+        log = log or get_prediction_log()
+        summary = {'new_customers': 0, 'updated_customers': 0, 'checked': 0, 'relabeled': 0, 'max_shift': 0.0}
+        for rows, last_id in log.iter_since(self.last_log_id, chunk_size):
+            rows = rows.dropna(subset=FEATURE_COLUMNS)
+            if len(rows):
+                result = self.update(rows, -rows.index.to_numpy())
+                for key in ('new_customers', 'updated_customers', 'checked', 'relabeled'):
+                    summary[key] += result[key]
+                summary['max_shift'] = max(summary['max_shift'], result['max_shift'])
+            self.last_log_id = last_id
+        return summary
+
+    def assignments(self):
+        return pd.DataFrame({'Customer ID': self.customer_ids, 'Cluster': self.labels})
+
+def main():
+    parser = argparse.ArgumentParser(description="온라인 K-means 로 전체 고객 재세분화")
+    sub = parser.add_subparsers(dest='command', required=True)
+    init = sub.add_parser('init', help=f"{BASE_DATA_PATH} 의 현재 클러스터로 상태 초기화")
+    init.add_argument('--data', default=BASE_DATA_PATH)
+    update = sub.add_parser('update', help="새 고객으로 중심을 갱신하고 영향 받는 고객만 재분류")
+    update.add_argument('--file', help="새 고객 CSV (Customer ID 와 8개 특성 컬럼). 없으면 예측 로그 사용")
+    export = sub.add_parser('export', help="고객별 클러스터 번호 저장")
+    export.add_argument('--output', default='data/customer_segments.csv')
+    parser.add_argument('--state', default=STATE_PATH)
+    args = parser.parse_args()
+
+    if args.command == 'init':
+        data = pd.read_csv(args.data, index_col=0)
+        segmenter = Resegmenter.from_customers(data)
+        changed = int((segmenter.labels != data['Cluster'].to_numpy()).sum())
+        segmenter.save(args.state)
+        print(f"{len(segmenter.labels):,}명으로 초기화 (기존 번호와 다른 고객 {changed:,}명)")
+    elif args.command == 'update':
+        segmenter = Resegmenter.load(args.state)
+        if args.file:
+            rows = pd.read_csv(args.file)
+            summary = segmenter.update(rows, rows['Customer ID'].to_numpy())
+        else:
+            summary = segmenter.update_from_log()
+        segmenter.save(args.state)
+        print(f"신규 {summary['new_customers']:,}명 / 기존 {summary['updated_customers']:,}명 반영, 재계산 {summary['checked']:,}명, "
+              f"번호 변경 {summary['relabeled']:,}명 (최대 중심 이동 {summary['max_shift']:.4f})")
+    else:
+        Resegmenter.load(args.state).assignments().to_csv(args.output, index=False)
+        print(f"저장: {args.output}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+import os
+import threading
+from collections import OrderedDict
+
+import joblib
+import numpy as np
+import pandas as pd
+
+MODEL_PATH = 'model/pipeline.pkl'
+
+# 모델 학습에 사용된 입력 컬럼 (순서 유지)
+NUMERIC_FEATURES = ['Age', 'Purchase Amount (USD)', 'Review Rating', 'Previous Purchases']
+CATEGORICAL_FEATURES = ['Category', 'Color', 'Season', 'Frequency of Purchases']
+FEATURE_COLUMNS = NUMERIC_FEATURES + CATEGORICAL_FEATURES
+
+# 한 번에 predict 에 넘길 행 수
+DEFAULT_CHUNK_SIZE = 50_000
+
+def load_model(path=MODEL_PATH):
+    return joblib.load(path)
+
+def model_signature(path=MODEL_PATH):
+    # 모델 파일이 바뀌었는지 확인하기 위한 (수정 시각, 크기)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+def read_feature_file(file, name=None):
+    # 업로드 파일(CSV / Parquet)을 읽어 예측에 필요한 컬럼만 남긴다
+    name = name or getattr(file, 'name', '') or str(file)
+    if os.path.splitext(name)[1].lower() in ('.parquet', '.pq'):
+        data = pd.read_parquet(file)
+    else:
+        data = pd.read_csv(file)
+
+    missing = [col for col in FEATURE_COLUMNS if col not in data.columns]
+    if missing:
+        raise ValueError(f"필수 컬럼이 없습니다: {', '.join(missing)}")
+    return data
+
+def prepare_features(data):
+    features = data[FEATURE_COLUMNS].copy()
+    for col in NUMERIC_FEATURES:
+        features[col] = pd.to_numeric(features[col], errors='coerce')
+    for col in CATEGORICAL_FEATURES:
+        features[col] = features[col].astype(str)
+    return features
+
+def predict_in_chunks(model, data, chunk_size=DEFAULT_CHUNK_SIZE, on_progress=None):
+    # 행 단위가 아닌 큰 청크 단위로 벡터화 예측 (수치형 값이 비어 있는 행은 <NA>)
+    features = prepare_features(data)
+    positions = np.flatnonzero(features[NUMERIC_FEATURES].notna().all(axis=1).to_numpy())
+    clusters = np.full(len(features), -1, dtype='int64')
+
+    total = len(positions)
+    for start in range(0, total, chunk_size):
+        chunk = positions[start:start + chunk_size]
+        clusters[chunk] = model.predict(features.iloc[chunk])
+        if on_progress is not None:
+            on_progress(start + len(chunk), total)
+
+    result = pd.Series(clusters, index=data.index, dtype='Int64', name='Cluster')
+    return result.mask(result < 0)
+
+def feature_key(row):
+    # 모델이 보는 값 그대로의 튜플 (30 과 30.0 처럼 같은 값만 같은 키, 반올림/자르기 없음)
+    age, amount, rating, purchases, *categories = row
+    return (float(age), float(amount), float(rating), float(purchases), *(str(value) for value in categories))
+
+class PredictionCache:
+    # 입력 튜플 -> 예측 클러스터 LRU 캐시. 모델 파일이 바뀌면 자동으로 비운다
+
+    def __init__(self, maxsize=4096, model_path=MODEL_PATH):
+        self.maxsize = maxsize
+        self.model_path = model_path
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._signature = model_signature(model_path)
+        self._lock = threading.Lock()
+
+    def _check_model(self):
+        signature = model_signature(self.model_path)
+        if signature != self._signature:
+            self._entries.clear()
+            self._signature = signature
+
+    def predict(self, model, data):
+        return self.predict_with_hits(model, data)[0]
+
+    def predict_with_hits(self, model, data):
+        # (예측 결과, 이 호출에서 캐시로 찾은 행 수). 누적 통계(stats)는 다른 세션의 호출도 섞이므로 호출별 값은 여기서 받는다
+        keys = [feature_key(row) for row in data[FEATURE_COLUMNS].itertuples(index=False, name=None)]
+        result = np.empty(len(keys), dtype=np.int64)
+        missing = []
+        with self._lock:
+            self._check_model()
+            for i, key in enumerate(keys):
+                cluster = self._entries.get(key)
+                if cluster is None:
+                    missing.append(i)
+                else:
+                    self._entries.move_to_end(key)
+                    result[i] = cluster
+            self.hits += len(keys) - len(missing)
+            self.misses += len(missing)
+
+        if missing:
+            # 캐시에 없는 행만 입력 그대로 한 번에 예측 (기록되는 입력과 예측 결과가 항상 같은 값에서 나온다)
+            predicted = np.asarray(model.predict(data[FEATURE_COLUMNS].iloc[missing]))
+            result[missing] = predicted
+            with self._lock:
+                for i, cluster in zip(missing, predicted):
+                    self._entries[keys[i]] = int(cluster)
+                    self._entries.move_to_end(keys[i])
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return result, len(keys) - len(missing)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hit_rate': self.hits / total if total else 0.0,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,93 @@
+import math
+import time
+
+import streamlit as st
+
+from ui.customer_index import CustomerIndex
+from ui.data_store import dataset_version
+from ui.eda import load_data
+from ui.instrumentation import cache_miss, measure
+from ui.segments import segment_label, segment_name
+
+# 화면에 보여줄 필터 이름
+FILTER_LABELS = {
+    'Category': "카테고리",
+    'Season': "계절",
+    'Location': "위치",
+    'Cluster': "고객 유형",
+    'Preferred Payment Method': "선호 결제 방식",
+}
+RANGE_LABELS = {
+    'Age': "나이",
+    'Purchase Amount (USD)': "구매 금액 (USD)",
+    'Review Rating': "리뷰 평점",
+    'Previous Purchases': "이전 구매 횟수",
+}
+PAGE_SIZES = [20, 50, 100]
+
+def get_customer_index():
+    # 데이터를 불러오지 못하면 None
+    with measure('customer_index', cached=True):
+        data = load_data()
+        if data is None:
+            return None
+        return _build_index(dataset_version(), data)
+
+@st.cache_resource(max_entries=2)
+def _build_index(version, _data):
+    # 데이터 버전마다 한 번만 색인을 만들어 모든 세션이 공유
+    cache_miss()
+    return CustomerIndex(_data)
+
+def customer_search_page():
+    st.title("🔍 고객 검색")
+
+    index = get_customer_index()
+    if index is None:
+        st.error("고객 데이터를 불러오지 못해 검색할 수 없습니다.")
+        return
+
+    st.markdown("### 고객 ID 로 찾기")
+    customer_id = st.number_input("고객 ID", min_value=0, value=0, step=1, help="0 이면 검색하지 않습니다.")
+    if customer_id:
+        customer = index.get(customer_id)
+        if customer is None:
+            st.warning(f"고객 ID {customer_id} 를 찾을 수 없습니다.")
+        else:
+            st.dataframe(customer.to_frame().T, hide_index=True)
+            if 'Cluster' in customer:
+                st.write(f"고객 유형 : {segment_name(customer['Cluster'])}")
+
+    st.markdown("---")
+    st.markdown("### 조건으로 찾기")
+
+    equals = {}
+    cols = st.columns(len(FILTER_LABELS))
+    for col, (name, label) in zip(cols, FILTER_LABELS.items()):
+        with col:
+            format_func = segment_label if name == 'Cluster' else str
+            equals[name] = st.multiselect(label, index.values(name), format_func=format_func)
+
+    ranges = {}
+    cols = st.columns(len(RANGE_LABELS))
+    for col, (name, label) in zip(cols, RANGE_LABELS.items()):
+        low, high = index.value_range(name)
+        if low is None or low == high:
+            continue
+        with col:
+            ranges[name] = st.slider(label, low, high, (low, high))
+    # 전체 범위를 고른 조건은 계산하지 않는다
+    ranges = {name: value for name, value in ranges.items() if value != index.value_range(name)}
+
+    page_size = st.selectbox("페이지당 고객 수", PAGE_SIZES, index=1)
+    page = st.number_input("페이지", min_value=1, value=1, step=1)
+
+    start = time.perf_counter()
+    with measure('customer_search'):
+        rows, total = index.search(equals, ranges, page - 1, page_size)
+    elapsed = time.perf_counter() - start
+
+    pages = max(1, math.ceil(total / page_size))
+    st.write(f"일치하는 고객 {total:,}명 (전체 {index.rows:,}명) · {page} / {pages:,} 페이지")
+    st.dataframe(rows, hide_index=True)
+    st.caption(f"조회 시간 {elapsed * 1000:.1f}ms")
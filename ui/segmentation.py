@@ -0,0 +1,29 @@
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+from sklearn.compose import ColumnTransformer
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+from ui.scoring import CATEGORICAL_FEATURES, NUMERIC_FEATURES
+
+def build_preprocessor():
+    # 노트북에서 사용한 것과 같은 전처리: 수치형은 정규화, 범주형은 원-핫 인코딩
+    return ColumnTransformer(
+        transformers=[
+            ('num', StandardScaler(), NUMERIC_FEATURES),
+            ('cat', OneHotEncoder(handle_unknown='ignore'), CATEGORICAL_FEATURES)
+        ])
+
+def align_labels(new_labels, reference_labels, n_clusters):
+    # 새 클러스터 번호를 기존 번호와 가장 많이 겹치도록 다시 매긴다
+    # (고객 유형 이름이 클러스터 번호에 묶여 있으므로 재학습 후에도 번호를 유지해야 한다)
+    new_labels = np.asarray(new_labels)
+    reference_labels = np.asarray(reference_labels)
+    size = max(n_clusters, int(reference_labels.max()) + 1 if len(reference_labels) else 0)
+    overlap = np.zeros((n_clusters, size), dtype=np.int64)
+    np.add.at(overlap, (new_labels, reference_labels), 1)
+
+    # 열 수가 행 수 이상이므로 모든 새 클러스터가 서로 다른 기존 번호에 배정된다
+    rows, cols = linear_sum_assignment(-overlap)
+    mapping = np.empty(n_clusters, dtype=np.int64)
+    mapping[rows] = cols
+    return mapping
@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+
+# 군집 번호별 고객 유형 표 (이름, 특성 설명, 마케팅 전략)
+# 예측/분석/검색/변화 분석 페이지와 일괄 예측 결과가 모두 이 표 하나를 사용한다
+SEGMENTS = pd.DataFrame({
+    'name': [
+        "고액 소비 VIP 고객",
+        "젊은 신규 고객",
+        "중간 소비 젊은 고객",
+        "중년층 충성 고객",
+        "보수적인 중장년층 고객",
+        "가격에 민감한 중년층 고객",
+    ],
+    'description': [
+        "이 고객은 고액을 자주 소비하는 VIP 고객입니다.",
+        "이 고객은 젊은 층으로, 다양한 제품을 시도하는 경향이 있습니다.",
+        "이 고객은 젊은 층이지만 중간 정도의 구매력을 가지고 있습니다.",
+        "이 고객은 중년층으로, 브랜드에 대한 높은 충성도를 보입니다.",
+        "이 고객은 중장년층으로, 익숙한 제품을 선호하고 변화를 꺼립니다.",
+        "이 고객은 중년층이지만 가격에 민감하며 할인을 선호합니다.",
+    ],
+    'strategy': [
+        "프리미엄 제품 추천, 개인화된 VIP 서비스 제공",
+        "트렌디한 제품 추천, 소셜 미디어 마케팅 강화",
+        "가성비 좋은 중급 제품 추천, 로열티 프로그램 참여 유도",
+        "장기 고객 혜택 강화, 신제품 우선 체험 기회 제공",
+        "신뢰성 강조, 기존 제품의 개선점 홍보",
+        "할인 행사 정보 우선 제공, 가격 대비 품질 강조",
+    ],
+}, index=pd.Index(range(6), name='Cluster'))
+
+UNKNOWN_SEGMENT = "알 수 없는 그룹"
+# 군집별로 추천할 인기 상품 수
+TOP_ITEMS = 3
+# 일괄 예측 결과에 붙이는 컬럼 (프로필 컬럼 -> 출력 컬럼)
+RECOMMENDATION_COLUMNS = {
+    'name': 'Customer Type',
+    'strategy': 'Marketing Strategy',
+    'top_items': 'Top Items',
+    'preferred_season': 'Preferred Season',
+}
+
+def segment_name(cluster):
+    try:
+        return SEGMENTS.at[int(cluster), 'name']
+    except (KeyError, TypeError, ValueError):
+        return f"클러스터 {cluster}"
+
+def segment_label(cluster):
+    # 차트 축/선택 상자에 쓰는 "번호 (이름)" 형식
+    return f"{cluster} ({segment_name(cluster)})"
+
+def _top_by_cluster(table, n):
+    # (Cluster, 값) 교차 집계의 건수로 군집마다 상위 n 개 값을 "a, b, c" 로 묶는다
+    counts = table['count']
+    counts = counts.set_axis(counts.index.set_levels(counts.index.levels[0].astype(np.int64), level=0))
+    ranked = counts.sort_values(ascending=False, kind='stable').groupby(level=0).head(n)
+    values = ranked.index.get_level_values(1).astype(str)
+    return pd.Series(values, index=ranked.index.get_level_values(0)).groupby(level=0).agg(', '.join)
+
+def segment_profiles(aggs=None, top_items=TOP_ITEMS):
+    # 고객 유형 표에 집계 큐브의 (Cluster, Item Purchased) / (Cluster, Season) 교차 집계로 구한
+    # 군집별 인기 상품과 선호 계절을 붙인다. 집계가 없으면 해당 컬럼은 빈 값
+    profiles = SEGMENTS.copy()
+    profiles['top_items'] = None
+    profiles['preferred_season'] = None
+    if aggs is not None:
+        if ('Cluster', 'Item Purchased') in aggs:
+            profiles['top_items'] = _top_by_cluster(aggs[('Cluster', 'Item Purchased')], top_items)
+        if ('Cluster', 'Season') in aggs:
+            profiles['preferred_season'] = _top_by_cluster(aggs[('Cluster', 'Season')], 1)
+    return profiles
+
+def _lookup(column, codes):
+    # 군집 위치(codes, 없으면 -1)로 프로필 값을 한 번에 가져와 범주형으로 만든다 (수백만 행도 정수 배열 연산 한 번)
+    values = column.astype(object).where(column.notna(), None)
+    categories = pd.Index(values.dropna().unique())
+    value_codes = categories.get_indexer(values)
+    return pd.Categorical.from_codes(np.where(codes >= 0, value_codes[codes], -1), categories)
+
+def recommend(clusters, profiles=None):
+    # 예측된 군집 번호 배열/Series 에 고객 유형, 마케팅 전략, 인기 상품, 선호 계절을 붙인 DataFrame
+    # 예측하지 못한 행(빈 값)이나 표에 없는 군집은 고객 유형이 "알 수 없는 그룹", 나머지는 빈 값
+    profiles = segment_profiles() if profiles is None else profiles
+    index = clusters.index if isinstance(clusters, pd.Series) else None
+    clusters = pd.array(clusters, dtype='Int64')
+    codes = profiles.index.get_indexer(clusters.fillna(-1).to_numpy(dtype=np.int64))
+
+    result = pd.DataFrame({output: _lookup(profiles[column], codes) for column, output in RECOMMENDATION_COLUMNS.items()},
+                          index=index)
+    name = RECOMMENDATION_COLUMNS['name']
+    result[name] = result[name].cat.add_categories([UNKNOWN_SEGMENT]).fillna(UNKNOWN_SEGMENT)
+    return result
@@ -0,0 +1,170 @@
+import glob
+import json
+import os
+from contextlib import contextmanager
+
+import pandas as pd
+import pyarrow as pa
+
+try:
+    import fcntl
+except ImportError:  # Windows: 잠금 없이 동작 (동시에 만들면 마지막 결과가 남는다)
+    fcntl = None
+
+# 데이터/집계 결과를 어디에 캐시할지: memory(프로세스별), disk(로컬 디스크), shm(공유 메모리)
+CACHE_BACKEND_ENV = 'CRM_CACHE_BACKEND'
+CACHE_BACKENDS = ['memory', 'disk', 'shm']
+CACHE_ROOTS = {
+    'disk': 'data/cache/shared',
+    'shm': '/dev/shm/crm-app',
+}
+# 키마다 남겨 두는 버전 수 (현재 버전 포함)
+KEEP_VERSIONS = 2
+
+def cache_backend():
+    backend = os.environ.get(CACHE_BACKEND_ENV, 'memory').lower()
+    if backend not in CACHE_BACKENDS:
+        raise ValueError(f"알 수 없는 캐시 방식입니다: {backend} (가능한 값: {', '.join(CACHE_BACKENDS)})")
+    return backend
+
+def _write_table(table, path):
+    # 비압축 Arrow IPC 파일로 원자적으로 저장 (읽는 쪽은 항상 완성된 파일만 본다)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with pa.OSFile(tmp_path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp_path, path)
+
+def _read_table(path):
+    # 파일을 mmap 으로 열어 여러 프로세스가 같은 페이지를 공유한다 (읽기 전용)
+    with pa.memory_map(path, 'r') as source:
+        return pa.ipc.open_file(source).read_all()
+
+def _to_pandas(table):
+    # 수치형 컬럼과 범주형 컬럼의 코드는 mmap 한 버퍼를 복사하지 않고 그대로 쓴다
+    # (to_pandas 는 범주형 코드를 프로세스마다 새로 만들므로 빈 값이 없는 범주형 컬럼은 코드 버퍼로 다시 만든다)
+    # 카테고리 목록, 문자열 컬럼, 인덱스는 프로세스마다 한 벌씩 만들어진다
+    frame = table.to_pandas(split_blocks=True)
+    columns = {}
+    for name in frame.columns:
+        index = table.schema.get_field_index(name) if isinstance(name, str) else -1
+        column = table.column(index) if index >= 0 else None
+        if (column is not None and pa.types.is_dictionary(column.type) and column.num_chunks == 1
+                and column.null_count == 0 and isinstance(frame[name].dtype, pd.CategoricalDtype)):
+            codes = column.chunk(0).indices.to_numpy(zero_copy_only=True)
+            columns[name] = pd.Categorical.from_codes(codes, dtype=frame[name].dtype, validate=False)
+        else:
+            columns[name] = frame[name]
+    return pd.DataFrame(columns, index=frame.index, copy=False)
+
+class SharedCache:
+    # 버전이 붙은 Arrow IPC 파일로 같은 호스트의 여러 Streamlit 프로세스가 결과 하나를 공유
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key, version, suffix):
+        return os.path.join(self.root, f'{key}-{version}{suffix}')
+
+    @contextmanager
+    def _lock(self, name, exclusive=True):
+        # 같은 키를 여러 프로세스가 동시에 만들지 않도록 (exclusive), 읽는 중에 파일이 지워지지 않도록 (shared) 파일 잠금
+        with open(os.path.join(self.root, f'{name}.lock'), 'w') as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _prune(self, key, version):
+        # 같은 키의 오래된 버전 파일 삭제. 방금 만든 버전 외에 최근 버전을 KEEP_VERSIONS 개까지 남겨,
+        # 배포 중에 서로 다른 버전을 쓰는 프로세스가 서로의 파일을 지우고 다시 만드는 일을 막는다
+        # 읽는 쪽은 목록/파일을 여는 동안 공유 잠금을 잡으므로 여는 도중에는 지우지 않는다 (이미 mmap 한 파일은 계속 읽을 수 있다)
+        prefix = f'{key}-'
+        versions = {}
+        for path in glob.glob(os.path.join(glob.escape(self.root), f'{glob.escape(prefix)}*')):
+            name = os.path.basename(path)
+            if name.endswith('.tmp') or name.endswith('.lock'):
+                continue
+            stem = name[len(prefix):].split('.', 1)[0]
+            versions.setdefault(stem, []).append(path)
+
+        def modified(stem):
+            return max((os.path.getmtime(path) for path in versions[stem] if os.path.exists(path)), default=0)
+
+        others = sorted((stem for stem in versions if stem != version), key=modified, reverse=True)
+        with self._lock(f'{key}.read'):
+            for stem in others[KEEP_VERSIONS - 1:]:
+                for path in versions[stem]:
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+
+    def _get(self, key, version, path, create, read):
+        # path 가 없으면 한 프로세스만 create() 로 만들고, 공유 잠금을 잡은 채로 read() 로 연다
+        # 확인한 뒤 잠금을 잡기 전에 다른 프로세스가 이 버전을 지웠다면 다시 만든다
+        while True:
+            if not os.path.exists(path):
+                with self._lock(key):
+                    if not os.path.exists(path):
+                        create()
+                        self._prune(key, version)
+            try:
+                with self._lock(f'{key}.read', exclusive=False):
+                    return read()
+            except FileNotFoundError:
+                continue
+
+    def frame(self, key, version, build):
+        # 캐시된 DataFrame 을 mmap 으로 읽고, 없으면 한 프로세스만 build() 로 만든다
+        path = self._path(key, version, '.arrow')
+        table = self._get(key, version, path,
+                          lambda: _write_table(pa.Table.from_pandas(build()), path),
+                          lambda: _read_table(path))
+        return _to_pandas(table)
+
+    def tables(self, key, version, build):
+        # DataFrame 값은 각각 Arrow 파일로, 나머지 값(행 수 등)은 JSON 목록 파일에 저장하는 dict 캐시
+        manifest_path = self._path(key, version, '.json')
+
+        def read():
+            # 목록 파일과 테이블 파일을 모두 열 때까지 공유 잠금 안에서 실행
+            with open(manifest_path, encoding='utf-8') as f:
+                manifest = json.load(f)
+            tables = [(name, _read_table(os.path.join(self.root, file_name))) for name, file_name in manifest['tables']]
+            return manifest['values'], tables
+
+        values, tables = self._get(key, version, manifest_path,
+                                   lambda: self._write_tables(key, version, build(), manifest_path), read)
+        result = dict(values)
+        for name, table in tables:
+            result[tuple(name) if isinstance(name, list) else name] = _to_pandas(table)
+        return result
+
+    def _write_tables(self, key, version, values, manifest_path):
+        manifest = {'tables': [], 'values': {}}
+        for i, (name, value) in enumerate(values.items()):
+            if isinstance(value, pd.DataFrame):
+                file_name = os.path.basename(self._path(key, version, f'.{i}.arrow'))
+                _write_table(pa.Table.from_pandas(value), os.path.join(self.root, file_name))
+                manifest['tables'].append([list(name) if isinstance(name, tuple) else name, file_name])
+            else:
+                manifest['values'][name] = value.item() if hasattr(value, 'item') else value
+        tmp_path = f'{manifest_path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        os.replace(tmp_path, manifest_path)
+
+_caches = {}
+
+def get_shared_cache(backend=None):
+    # memory 방식이면 None (각 프로세스의 st.cache_* 만 사용)
+    backend = backend or cache_backend()
+    if backend == 'memory':
+        return None
+    if backend not in _caches:
+        _caches[backend] = SharedCache(CACHE_ROOTS[backend])
+    return _caches[backend]
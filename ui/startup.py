@@ -0,0 +1,56 @@
+import importlib
+import sys
+import threading
+import time
+
+# 이 모듈이 처음 import 된 시점 (= 앱 프로세스의 첫 실행 시점)
+PROCESS_STARTED = time.perf_counter()
+
+_report = {}
+_lock = threading.Lock()
+
+def _entry(page):
+    return _report.setdefault(page, {'import_s': 0.0, 'first_render_s': None, 'last_render_s': None, 'renders': 0})
+
+def import_page_module(page, module_name):
+    # 페이지가 처음 선택될 때만 모듈을 import 하고, 그때 걸린 시간을 기록
+    if module_name in sys.modules:
+        with _lock:
+            _entry(page)
+        return sys.modules[module_name]
+
+    start = time.perf_counter()
+    module = importlib.import_module(module_name)
+    elapsed = time.perf_counter() - start
+    with _lock:
+        _entry(page)['import_s'] += elapsed
+    return module
+
+def record_render(page, seconds):
+    with _lock:
+        entry = _entry(page)
+        if entry['first_render_s'] is None:
+            # 첫 렌더링에는 모델/데이터 캐시 초기화 비용이 포함된다
+            entry['first_render_s'] = seconds
+        entry['last_render_s'] = seconds
+        entry['renders'] += 1
+
+def startup_report():
+    # 표로 바로 보여줄 수 있도록 행 목록으로 돌려준다 (pandas 를 import 하지 않기 위해)
+    def fmt(value):
+        return None if value is None else round(value, 3)
+
+    with _lock:
+        return [
+            {
+                '페이지': page,
+                'import (초)': fmt(entry['import_s']),
+                '첫 렌더링 (초)': fmt(entry['first_render_s']),
+                '최근 렌더링 (초)': fmt(entry['last_render_s']),
+                '렌더링 횟수': entry['renders'],
+            }
+            for page, entry in _report.items()
+        ]
+
+def uptime():
+    return time.perf_counter() - PROCESS_STARTED
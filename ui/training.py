@@ -0,0 +1,155 @@
+import argparse
+import json
+import os
+import shutil
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+from joblib import Parallel, delayed
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import silhouette_score
+from sklearn.model_selection import StratifiedKFold, cross_validate
+from sklearn.pipeline import Pipeline
+
+from ui.prediction_log import get_prediction_log
+from ui.scoring import FEATURE_COLUMNS, MODEL_PATH, load_model, prepare_features
+from ui.segmentation import align_labels, build_preprocessor
+
+TRAINING_DATA_PATH = 'data/shopping_trends.csv'
+VERSIONS_DIR = 'model/versions'
+
+@contextmanager
+def stage(timings, name):
+    # 단계별 소요 시간을 기록하고 출력
+    start = time.perf_counter()
+    print(f"[{name}] 시작")
+    yield
+    timings[name] = round(time.perf_counter() - start, 3)
+    print(f"[{name}] {timings[name]:.2f}초")
+
+def load_training_data(path=TRAINING_DATA_PATH, include_log=True):
+    frames = [pd.read_csv(path, usecols=FEATURE_COLUMNS)]
+    if include_log:
+        # 앱에서 예측된 신규 고객(예측 로그)도 학습 데이터에 포함
+        log = get_prediction_log().read_all()
+        if not log.empty:
+            frames.append(log[FEATURE_COLUMNS])
+    data = prepare_features(pd.concat(frames, ignore_index=True))
+    return data.dropna().reset_index(drop=True)
+
+def _fit_kmeans(X, k, batch_size, random_state, sample_size):
+    model = MiniBatchKMeans(n_clusters=k, batch_size=batch_size, n_init='auto', random_state=random_state)
+    labels = model.fit_predict(X)
+    silhouette = None
+    if k > 1:
+        silhouette = float(silhouette_score(X, labels, sample_size=min(sample_size, X.shape[0]), random_state=random_state))
+    return {'k': k, 'inertia': float(model.inertia_), 'silhouette': silhouette}
+
+def select_k(X, k_values, n_jobs, batch_size, random_state, sample_size=10_000):
+    # 후보 k 마다 MiniBatchKMeans 를 여러 코어에서 동시에 학습
+    return Parallel(n_jobs=n_jobs)(
+        delayed(_fit_kmeans)(X, k, batch_size, random_state, sample_size) for k in k_values
+    )
+
+def _best_k(scores):
+    # 실루엣 점수가 가장 높은 k
+    candidates = [s for s in scores if s['silhouette'] is not None]
+    return max(candidates, key=lambda s: s['silhouette'])['k']
+
+def retrain(n_clusters=6, k_range=None, include_log=True, n_jobs=-1, cv=5, batch_size=4096,
+            random_state=42, output_dir=VERSIONS_DIR, promote=False):
+    timings = {}
+
+    with stage(timings, '데이터 로드'):
+        data = load_training_data(include_log=include_log)
+        print(f"  학습 데이터 {len(data):,}행")
+
+    with stage(timings, '전처리'):
+        preprocessor = build_preprocessor()
+        X = preprocessor.fit_transform(data)
+
+    k_scores = []
+    if k_range:
+        with stage(timings, 'k 선택'):
+            k_scores = select_k(X, range(k_range[0], k_range[1] + 1), n_jobs, batch_size, random_state)
+            for s in k_scores:
+                silhouette = f"{s['silhouette']:.4f}" if s['silhouette'] is not None else '-'
+                print(f"  k={s['k']:<3} inertia={s['inertia']:,.1f} silhouette={silhouette}")
+            n_clusters = _best_k(k_scores)
+            print(f"  선택된 k = {n_clusters}")
+
+    with stage(timings, '클러스터링'):
+        kmeans = MiniBatchKMeans(n_clusters=n_clusters, batch_size=batch_size, n_init='auto', random_state=random_state)
+        labels = kmeans.fit_predict(X)
+
+    with stage(timings, '클러스터 번호 정렬'):
+        # 기존 모델의 예측과 가장 많이 겹치도록 번호를 맞춰 고객 유형 이름을 유지
+        if os.path.exists(MODEL_PATH):
+            reference = np.asarray(load_model().predict(data))
+            mapping = align_labels(labels, reference, n_clusters)
+            labels = mapping[labels]
+
+    classifier = Pipeline([
+        ('preprocessor', build_preprocessor()),
+        ('classifier', LogisticRegression(max_iter=1000, random_state=random_state))
+    ])
+
+    with stage(timings, '교차 검증'):
+        folds = StratifiedKFold(n_splits=cv, shuffle=True, random_state=random_state)
+        scores = cross_validate(classifier, data, labels, cv=folds, n_jobs=n_jobs, scoring='accuracy')
+        accuracy = scores['test_score']
+        print(f"  정확도 {accuracy.mean():.4f} (± {accuracy.std():.4f})")
+
+    with stage(timings, '최종 학습'):
+        classifier.fit(data, labels)
+
+    with stage(timings, '저장'):
+        os.makedirs(output_dir, exist_ok=True)
+        version = datetime.now().strftime('%Y%m%d_%H%M%S')
+        artifact = os.path.join(output_dir, f'pipeline_{version}.pkl')
+        joblib.dump(classifier, artifact)
+        metadata = {
+            'version': version,
+            'rows': len(data),
+            'n_clusters': int(n_clusters),
+            'cluster_sizes': np.bincount(labels).tolist(),
+            'cv_accuracy_mean': float(accuracy.mean()),
+            'cv_accuracy_std': float(accuracy.std()),
+            'k_scores': k_scores,
+            'sklearn': sklearn.__version__,
+            'timings': timings,
+        }
+        with open(artifact.replace('.pkl', '.json'), 'w', encoding='utf-8') as f:
+            json.dump(metadata, f, ensure_ascii=False, indent=2)
+        if promote:
+            # 앱이 읽는 모델 파일을 원자적으로 교체
+            tmp_path = f'{MODEL_PATH}.{os.getpid()}.tmp'
+            shutil.copyfile(artifact, tmp_path)
+            os.replace(tmp_path, MODEL_PATH)
+        print(f"  {artifact}{' -> ' + MODEL_PATH if promote else ''}")
+
+    print(f"전체 소요 시간: {sum(timings.values()):.2f}초")
+    return artifact, metadata
+
+def main():
+    parser = argparse.ArgumentParser(description="고객 세그먼테이션 모델 재학습 (MiniBatchKMeans + LogisticRegression)")
+    parser.add_argument('--clusters', type=int, default=6, help="클러스터 수 (--k-range 를 주면 무시)")
+    parser.add_argument('--k-range', type=int, nargs=2, metavar=('MIN', 'MAX'), help="실루엣 점수로 k 를 고를 범위")
+    parser.add_argument('--no-log', action='store_true', help="예측 로그를 학습 데이터에서 제외")
+    parser.add_argument('--jobs', type=int, default=-1, help="병렬 작업 수 (-1: 모든 코어)")
+    parser.add_argument('--cv', type=int, default=5, help="교차 검증 fold 수")
+    parser.add_argument('--batch-size', type=int, default=4096, help="MiniBatchKMeans 배치 크기")
+    parser.add_argument('--promote', action='store_true', help=f"학습된 모델로 {MODEL_PATH} 를 교체")
+    args = parser.parse_args()
+
+    retrain(n_clusters=args.clusters, k_range=args.k_range, include_log=not args.no_log, n_jobs=args.jobs,
+            cv=args.cv, batch_size=args.batch_size, promote=args.promote)
+
+if __name__ == '__main__':
+    main()